@@ -1,267 +1,213 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
-import os
-import matplotlib.font_manager as fm
-import matplotlib.pyplot as plt
-import platform
-
-# 한글 폰트 자동 설정 함수
-def set_korean_font():
-    system = platform.system()
-
-    if system == "Darwin":   # macOS
-        plt.rcParams['font.family'] = 'AppleGothic'
-    elif system == "Windows":
-        plt.rcParams['font.family'] = 'Malgun Gothic'
-    else:
-        # Linux, Streamlit Cloud 등
-        plt.rcParams['font.family'] = 'NanumGothic'
-
-    plt.rcParams['axes.unicode_minus'] = False
-
-@st.cache_data
-def load_data():
-    # 1) CSV 읽기 (N/A를 결측값으로 인식)
-    df = pd.read_csv("covid_worldwide.csv", na_values=["N/A"])
-
-    # 2) 컬럼 이름 앞뒤 공백 제거 (예: "Country " → "Country")
-    df.columns = df.columns.str.strip()
-
-    # 3) Country 문자열 처리
-    if "Country" not in df.columns:
-        st.error("CSV 파일에 'Country'라는 컬럼이 없습니다. 현재 컬럼: " + ", ".join(df.columns))
-        st.stop()
-
-    df["Country"] = df["Country"].astype(str).str.strip()
-
-    # 4) N/A(결측) 포함된 행 삭제
-    df = df.dropna()
-
-    # 5) Country가 빈 문자열인 행 삭제
-    df = df[df["Country"] != ""]
-
-    # 6) 숫자형 컬럼 숫자로 변환
-    num_cols = [
-        "Total Cases",
-        "Total Deaths",
-        "Total Recovered",
-        "Active Cases",
-        "Total Test",
-        "Population",
-    ]
-
-    for col in num_cols:
-        if col in df.columns:
-            # 쉼표 제거 후 숫자로 변환
-            df[col] = (
-                df[col]
-                .astype(str)
-                .str.replace(",", "", regex=False)
-                .str.strip()
-            )
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-        else:
-            st.error(f"CSV 파일에 '{col}' 컬럼이 없습니다. 현재 컬럼: " + ", ".join(df.columns))
-            st.stop()
-
-    # 숫자 변환 후 NaN 생긴 행 또 제거
-    df = df.dropna(subset=num_cols)
-
-    # 인덱스 리셋
-    df = df.reset_index(drop=True)
 
-    return df
+import charts
+import geo
+import precomputed
+import profiling
+import refresher
+from ages import BAND_PRESETS, load_age_table
+from downsample import METHODS as DOWNSAMPLE_METHODS, TARGET_POINTS
+from data_loader import DAILY_CSV, load_data, load_data_with_index
+from metrics import top_n
+from regions import load_region_hierarchy
+from timeseries import GRANULARITIES, load_aggregation_cube
 
 # 타이틀 및 웹페이지 가로로 사용
 st.set_page_config(page_title="COVID-19 World Dashboard",page_icon="🌏",layout="wide")
-set_korean_font()
-
-# 전세계 데이터 또는 대한민국 데이터 선택
-world_data_checkbox = st.sidebar.checkbox("Worldwide Data")
 
-if world_data_checkbox:
-
-    st.sidebar.markdown("### 📌 Show/Hide Options")
-    show_preview = st.sidebar.checkbox("데이터 미리보기")
-    show_cases_ratio = st.sidebar.checkbox("인구수 대비 감염자 비율(상위20개국)")
-    show_death_ratio = st.sidebar.checkbox("감염자 대비 사망자 비율(상위20개국)")
-    show_recover_ratio = st.sidebar.checkbox("감염자 대비 회복인원 비율(상위20개국)")
-    show_worldmap = st.sidebar.checkbox("전 세계 누적 확진자 지도")
+# COVID_PROFILE=1 또는 ?profile=1 일 때만 구역별 시간·캐시 히트를 기록 (profiling.py)
+profiling.begin()
 
-    def main():
-        
-        st.title("🌍 COVID-19 세계 감염 현황 대시보드")
+# COVID_REFRESH_SECONDS가 있으면 CSV 변경을 백그라운드에서 수집해 교체 (refresher.py)
+refresher.start_background()
 
-        df = load_data()
 
-        if show_preview:
-        # 디버깅용: 데이터 미리보기
-            st.markdown("#### 🔍 데이터 미리보기")
-            st.dataframe(df.head())
+# 화면 구역 실행 방식
+# - 구역 안의 위젯(국가 선택, 추세 설정 등)은 @profiling.fragment(st.fragment + 구역 프로파일링) 안에 두어, 값을 바꾸면 그 구역만 다시 실행
+# - 같은 묶음의 구역이 여러 개 켜지면 탭으로 나누고, 열려 있는 탭의 구역만 계산
+@profiling.fragment
+def render_lazily(sections, key, *args):
+    if len(sections) == 1:
+        sections[0][1](*args)
+        return
 
-            st.markdown(f"총 행 개수: **{len(df)}**, 총 국가 수: **{df['Country'].nunique()}**")
+    tabs = st.tabs([label for label, _ in sections], key=key, on_change="rerun")
+    for tab, (_, render) in zip(tabs, sections):
+        # 미리 만들기(build.py) 중에는 닫힌 탭도 모두 그림
+        if tab.open or precomputed.recording():
+            with tab:
+                render(*args)
 
 
-        if show_cases_ratio:
-            df_case = df[df["Total Cases"] >= 1000].copy()
+# 전세계 데이터 또는 대한민국 데이터 선택
+world_data_checkbox = st.sidebar.checkbox("Worldwide Data")
 
-            df_case["Cases per 100k"] = (df_case["Total Cases"] / df_case["Population"]) * 100000
+if world_data_checkbox:
 
-            st.markdown("#### 👥 인구수 대비 누적 감염자 수 (상위 20개국, 인구 10만 명당)")
+    st.sidebar.markdown("### 📌 Show/Hide Options")
+    show_preview = st.sidebar.checkbox("데이터 미리보기")
+    show_cases_ratio = st.sidebar.checkbox("인구수 대비 감염자 비율(상위 N개국)")
+    show_death_ratio = st.sidebar.checkbox("감염자 대비 사망자 비율(상위 N개국)")
+    show_recover_ratio = st.sidebar.checkbox("감염자 대비 회복인원 비율(하위 N개국)")
+    show_worldmap = st.sidebar.checkbox("전 세계 누적 확진자 지도")
 
-            top20_case = df_case.sort_values("Cases per 100k", ascending=False).head(20)
+    # 순위 차트 공통 설정
+    min_cases = st.sidebar.number_input("순위 대상 최소 누적 확진자 수", min_value=0, value=1000, step=1000)
+    top_count = st.sidebar.slider("순위 차트 국가 수 (N)", min_value=5, max_value=50, value=20, step=5)
 
-            fig_ratio = px.bar(
-                top20_case,
-                x="Country",
-                y="Cases per 100k",
-                hover_data=["Total Cases", "Population"],
-                labels={"Cases per 100k": "Cases per 100,000 people"},
-                title="인구 10만 명당 누적 확진자 수 상위 20개국",
-            )
+    def cases_ratio_section(df):
+        with profiling.section("인구 대비 감염자 순위"):
+            st.markdown(f"#### 👥 인구수 대비 누적 감염자 수 (상위 {top_count}개국, 인구 10만 명당)")
 
-            fig_ratio.update_layout(xaxis_tickangle=-45)
+            # 파생 지표는 load_data()에서 미리 계산됨
+            # 기본 설정이면 미리 만들어 둔 차트를 사용 (precomputed.py)
+            fig_ratio = precomputed.figure("cases_ratio", [top_count, min_cases], lambda: charts.cases_ratio_bar(
+                top_n(df, "Cases per 100k", top_count, min_cases),
+                f"인구 10만 명당 누적 확진자 수 상위 {top_count}개국, Total Cases >= {min_cases:,}",
+            ))
 
             st.plotly_chart(fig_ratio, use_container_width=True)
-        
-        if show_death_ratio:
-            st.markdown("#### ☠️ 감염자 대비 사망자 비율 (치명률 상위 20개국)")
 
-            # 감염자가 최소 1000명 이상인 데이터를 사용
-            df_cfr = df[df["Total Cases"] >= 1000].copy()
+    def death_ratio_section(df):
+        with profiling.section("치명률 순위"):
+            st.markdown(f"#### ☠️ 감염자 대비 사망자 비율 (치명률 상위 {top_count}개국)")
 
-        
-            df_cfr["CFR (%)"] = (df_cfr["Total Deaths"] / df_cfr["Total Cases"]) * 100
+            # 감염자가 최소 min_cases명 이상인 데이터를 사용
+            fig_cfr = precomputed.figure("death_ratio", [top_count, min_cases], lambda: charts.percent_ranking_bar(
+                top_n(df, "CFR (%)", top_count, min_cases),
+                "CFR (%)",
+                "Total Deaths",
+                "Case Fatality Rate (%)",
+                f"감염자 대비 사망자 비율 상위 {top_count}개국 (치명률), Total Cases >= {min_cases:,}",
+            ))
 
-            top20_cfr = df_cfr.sort_values("CFR (%)", ascending=False).head(20)
+            st.plotly_chart(fig_cfr, use_container_width=True)
 
-            fig_cfr = px.bar(
-                top20_cfr,
-                x="Country",
-                y="CFR (%)",
-                hover_data=["Total Cases", "Total Deaths"],
-                text = "CFR (%)",
-                labels={"CFR (%)": "Case Fatality Rate (%)"},
-                title="감염자 대비 사망자 비율 상위 20개국 (치명률), Total Cases >= 1000",
-            )
+    def recover_ratio_section(df):
+        with profiling.section("회복률 순위"):
+            st.markdown(f"### 💉 감염자 대비 회복인원 비율(회복률 하위 {top_count}개국)")
 
-            fig_cfr.update_traces(
-                texttemplate='%{text:.2f}%',            
-                textposition='outside'                    
-            )
-            max_val = top20_cfr["CFR (%)"].max()
-            fig_cfr.update_layout(
-                yaxis_range=[0, max_val * 1.15],    
-                xaxis_tickangle=-45
-            )
+            fig_cfr = precomputed.figure("recover_ratio", [top_count, min_cases], lambda: charts.percent_ranking_bar(
+                top_n(df, "Recovered (%)", top_count, min_cases, ascending=True),
+                "Recovered (%)",
+                "Total Recovered",
+                "Recovered Ratio (%)",
+                f"감염자 대비 회복 인원 비율 하위 {top_count}개국 (회복률), Total Cases >= {min_cases:,}",
+            ))
 
             st.plotly_chart(fig_cfr, use_container_width=True)
 
-        if show_recover_ratio:
-            st.markdown("### 💉 감염자 대비 회복인원 비율(회복률 하위 20개국)")
+    # 국가 검색·선택을 바꾸면 이 패널만 다시 실행 (지도와 순위 차트는 그대로)
+    @profiling.fragment
+    def country_detail():
+        with profiling.section("국가별 상세"):
+            st.subheader("📊 국가별 상세 현황")
 
-            df_recovered = df[df["Total Cases"] >= 1000].copy()
+            # 정렬된 국가 목록과 국가 → 행 번호 인덱스는 데이터를 읽을 때 한 번만 생성.
+            # fragment만 다시 실행될 때도 프레임과 인덱스를 같은 버전으로 함께 읽음 (인자로 받은 프레임은 이전 rerun 것)
+            df, country_index = load_data_with_index()
 
-            df_recovered["Recovered (%)"] = (df_recovered["Total Recovered"] / df_recovered["Total Cases"]) *100
-
-            top20_recovery = df_recovered.sort_values("Recovered (%)", ascending=True).head(20)
-
-            fig_cfr = px.bar(
-                top20_recovery,
-                x="Country",
-                y="Recovered (%)",
-                hover_data=["Total Cases", "Total Recovered"],
-                text="Recovered (%)",                    
-                labels={"Recovered (%)": "Recovered Ratio (%)"},
-                title="감염자 대비 회복 인원 비율 하위 20개국 (회복률), Total Cases >= 1000",
-            )
+            if not len(country_index):
+                st.error("Country 데이터가 비어 있습니다.")
+                st.stop()
 
-            fig_cfr.update_traces(
-                texttemplate='%{text:.2f}%',            
-                textposition='outside'                    
-            )
-            max_val = top20_recovery["Recovered (%)"].max()
-            fig_cfr.update_layout(
-                yaxis_range=[0, max_val * 1.15],    
-                xaxis_tickangle=-45
-            )
+            query = st.text_input("국가 검색 (이름 앞부분, 오타 허용)")
+            countries = country_index.search(query) if query else country_index.names
 
-            st.plotly_chart(fig_cfr, use_container_width=True)
+            if not countries:
+                st.warning(f"'{query}'와(과) 일치하는 국가가 없어 전체 목록을 표시합니다.")
+                countries = country_index.names
 
-        if show_worldmap:
+            selected_country = st.selectbox("국가를 선택하세요", countries, index=0)
 
-            col_map, col_detail = st.columns([2, 1])
-
-            # =======================
-            # 왼쪽: 세계 지도
-            # =======================
-            with col_map:
-                st.subheader("🗺 전세계 누적 확진자 지도")
-
-                # Plotly choropleth (나라 이름 기반)
-                fig = px.choropleth(
-                    df,
-                    locations="Country",              # Country 컬럼 사용
-                    locationmode="country names",     # 나라 이름 모드
-                    color="Total Cases",
-                    hover_name="Country",
-                    color_continuous_scale="Reds",
-                    projection="natural earth",
-                    labels={"Total Cases": "Total Cases"},
-                )
+            # 선택된 국가에 해당하는 행 찾기 (인덱스로 바로 조회)
+            position = country_index.row(selected_country)
 
-                fig.update_layout(
-                    margin=dict(l=0, r=0, t=0, b=0),
-                    coloraxis_colorbar=dict(title="Total Cases")
-                )
+            if position is None:
+                st.error(f"'{selected_country}' 국가에 대한 데이터가 없습니다.")
+                st.stop()
 
-                st.plotly_chart(fig, use_container_width=True)
+            row = df.iloc[position]
 
-            # =======================
-            # 오른쪽: 국가 선택 + 지표
-            # =======================
-            with col_detail:
-                st.subheader("📊 국가별 상세 현황")
+            st.markdown(f"### {selected_country}")
 
-                countries = sorted(df["Country"].unique().tolist())
+            c1, c2 = st.columns(2)
+            c3, c4 = st.columns(2)
 
-                if not countries:
-                    st.error("Country 데이터가 비어 있습니다.")
-                    st.stop()
+            c1.metric("Total Cases", f"{int(row['Total Cases']):,}")
+            c2.metric("Total Deaths", f"{int(row['Total Deaths']):,}")
+            c3.metric("Total Recovered", f"{int(row['Total Recovered']):,}")
+            c4.metric("Active Cases", f"{int(row['Active Cases']):,}")
 
-                selected_country = st.selectbox("국가를 선택하세요", countries, index=0)
+            st.markdown("### 🧪 검사 및 인구")
+            p1, p2 = st.columns(2)
+            p1.metric("Total Test", f"{int(row['Total Test']):,}")
+            p2.metric("Population", f"{int(row['Population']):,}")
 
-                # 선택된 국가에 해당하는 행 찾기 (안전하게)
-                mask = df["Country"] == selected_country
-                country_df = df.loc[mask]
+    def main():
 
-                if country_df.empty:
-                    st.error(f"'{selected_country}' 국가에 대한 데이터가 없습니다.")
-                    st.stop()
+        st.title("🌍 COVID-19 세계 감염 현황 대시보드")
 
-                # 첫 번째 행만 사용
-                row = country_df.iloc[0]
+        with profiling.section("데이터 읽기"):
+            df = load_data()
 
-                st.markdown(f"### {selected_country}")
+        if show_preview:
+            with profiling.section("데이터 미리보기"):
+                # 디버깅용: 데이터 미리보기
+                st.markdown("#### 🔍 데이터 미리보기")
+                st.dataframe(df.head())
 
-                c1, c2 = st.columns(2)
-                c3, c4 = st.columns(2)
+                st.markdown(f"총 행 개수: **{len(df)}**, 총 국가 수: **{df['Country'].nunique()}**")
 
-                c1.metric("Total Cases", f"{int(row['Total Cases']):,}")
-                c2.metric("Total Deaths", f"{int(row['Total Deaths']):,}")
-                c3.metric("Total Recovered", f"{int(row['Total Recovered']):,}")
-                c4.metric("Active Cases", f"{int(row['Active Cases']):,}")
+        # 순위 차트는 켜진 것이 여러 개면 탭으로 나누고 열린 탭만 그림
+        rankings = []
+        if show_cases_ratio:
+            rankings.append(("👥 인구 대비 감염자", cases_ratio_section))
+        if show_death_ratio:
+            rankings.append(("☠️ 치명률", death_ratio_section))
+        if show_recover_ratio:
+            rankings.append(("💉 회복률", recover_ratio_section))
+        if rankings:
+            render_lazily(rankings, "world_ranking_tab", df)
 
-                st.markdown("### 🧪 검사 및 인구")
-                p1, p2 = st.columns(2)
-                p1.metric("Total Test", f"{int(row['Total Test']):,}")
-                p2.metric("Population", f"{int(row['Population']):,}")
+        if show_worldmap:
+            with profiling.section("세계 지도"):
+
+                col_map, col_detail = st.columns([2, 1])
+
+                # =======================
+                # 왼쪽: 세계 지도
+                # =======================
+                with col_map:
+                    st.subheader("🗺 전세계 누적 확진자 지도")
+
+                    # 입력 데이터가 같으면 캐시된 지도를 재사용 (국가 선택만 바뀌어도 다시 그리지 않음)
+                    # 나라 경계 GeoJSON이 있으면 그 파일로 그림 (오프라인에서도 표시)
+                    borders = geo.load_geojson(geo.WORLD_GEOJSON)
+                    fig = precomputed.figure("world_map", [borders and borders.version], lambda: charts.world_choropleth(
+                        df[["Country", "ISO3", "Total Cases"]],
+                        geo.WORLD_FEATURE_KEY,
+                        borders and borders.version,
+                        borders and borders.geojson,
+                    ))
+
+                    st.plotly_chart(fig, use_container_width=True)
+                    if geo.OFFLINE and borders is None:
+                        # 내장 세계 지도는 나라 경계(topojson)를 CDN에서 받으므로 오프라인에서는 비어 보임
+                        st.warning(
+                            f"오프라인 지도 모드인데 geodata/{geo.WORLD_GEOJSON} 파일이 없어 나라 경계를 그릴 수 없습니다. "
+                            "인터넷에 연결되지 않았다면 지도가 비어 보입니다."
+                        )
+
+                    unmatched = geo.unmatched_countries(df)
+                    if unmatched:
+                        st.caption("지도에 표시되지 않은 항목: " + ", ".join(unmatched))
+
+                # =======================
+                # 오른쪽: 국가 선택 + 지표
+                # =======================
+                with col_detail:
+                    country_detail()
 
     if __name__ == "__main__":
         main()
@@ -285,289 +231,220 @@ if south_korea_data_checkbox:
     show_age_ConfirmedCase = st.sidebar.checkbox("연령대별 누적 확진자 수")
     show_age_dead = st.sidebar.checkbox("연령대별 누적 사망자 수")
     show_region = st.sidebar.checkbox("시도별 코로나 발생수 지도 산점도")
-    
+
     # ================================================================
     # ========================은영님 부분 그래프=========================
     # ================================================================
 
     # 대한민국 3개월 이동평균 및 월별 국내발생, 해외유입
+    # 설정 위젯은 구역 안에 두어, 값을 바꾸면 이 그래프만 다시 실행
+    @profiling.fragment
+    def moving_average_section():
+        with profiling.section("국내 추세"):
+            # 일/주/월/분기/연 합계와 이동평균은 데이터가 바뀔 때만 한 번 계산 (timeseries.py)
+            cube = load_aggregation_cube()
+            if cube.empty:
+                st.info(f"'{DAILY_CSV}'에 데이터 행이 없어 추세 그래프를 그릴 수 없습니다.")
+                return
+
+            st.markdown("#### 📅 추세 그래프 설정")
+            c1, c2, c3 = st.columns([1, 1, 2])
+            granularity = c1.selectbox("집계 단위", list(GRANULARITIES), index=2)
+            _, windows, unit, date_format = GRANULARITIES[granularity]
+            window = c2.select_slider(
+                "이동평균 창 크기",
+                options=windows,
+                value=windows[1],
+                format_func=lambda w: "없음" if w == 1 else f"{w}{unit}",
+            )
+            first_day, last_day = cube.date_range()
+            start_day, end_day = c3.slider(
+                "기간", min_value=first_day, max_value=last_day, value=(first_day, last_day), format="YYYY-MM-DD"
+            )
+
+            # 점이 많으면 차트 폭에 맞게 줄여서 전송 (기간을 좁히면 그 구간에서 다시 줄임)
+            total_points = cube.count(granularity, start_day, end_day)
+            method = None
+            if total_points > TARGET_POINTS:
+                method = st.radio("다운샘플링", list(DOWNSAMPLE_METHODS) + ["사용 안 함"], horizontal=True)
+            smooth_label = f"{window}{unit} 이동평균" if window > 1 else "합계"
+
+            st.subheader(f"📅 {smooth_label} · {granularity}별 국내발생 & 해외유입")
+            st.write(f"**그래프 설명:** 아래 그래프는 국내 발생 및 해외 유입 확진자 수를 {granularity}별로 합산하고, {smooth_label}을(를) 적용한 추세선입니다.")
+            st.write("---")
+
+            # 그래프 그리기 (미리 만든 차트가 있으면 자르기·다운샘플링도 하지 않음)
+            def build_trend():
+                # 미리 계산된 표를 잘라서 사용 (다시 집계하지 않음)
+                if method in DOWNSAMPLE_METHODS:
+                    df_smooth = cube.downsampled(
+                        granularity, window, start_day, end_day, DOWNSAMPLE_METHODS[method], TARGET_POINTS
+                    )
+                else:
+                    df_smooth = cube.slice(granularity, window, start_day, end_day)
+                return charts.trend_line(
+                    df_smooth,
+                    f"{granularity}별 국내 발생 및 해외 유입 확진자 수 ({smooth_label})",
+                    "월(Month)" if granularity == "월" else granularity,
+                    f"{granularity}별 확진자 수(명)",
+                    date_format,
+                )
+
+            params = [granularity, window, start_day, end_day, method]
+            fig = precomputed.figure("trend", params, build_trend)
+
+            st.plotly_chart(fig, use_container_width=True)
+            shown = len(fig.data[0].x) if fig.data else 0
+            if shown < total_points:
+                st.caption(f"전체 {total_points:,}개 시점 중 {shown:,}개만 표시 ({method})")
+
+    # 시도별 하위 지역: 펼쳤을 때만 계산하고, 시도를 바꾸면 이 부분만 다시 실행
+    @profiling.fragment
+    def sido_drilldown(sido_names):
+        expander = st.expander("시도별 시군구 보기", key="sido_drilldown", on_change="rerun")
+        if expander.open:
+            with expander:
+                # 원본에 시군구 이름이 없어 순번으로 표시
+                sido = st.selectbox("시도 선택", sido_names)
+                hierarchy = load_region_hierarchy()
+                st.dataframe(hierarchy.children(sido), use_container_width=True)
+                if sido in hierarchy.mismatches.index:
+                    diff = hierarchy.mismatches.loc[sido]
+                    st.warning(
+                        f"원본의 {sido} 합계 행과 시군구 합계가 다릅니다 (합계 행 − 시군구 합계): "
+                        + ", ".join(f"{col} {value:+,}" for col, value in diff.items())
+                    )
+
     if show_moving_k:
-        file_name = '일별 국내 & 해외.csv'
-        try:
-            df = pd.read_csv(file_name, encoding='utf-8-sig')
-        except FileNotFoundError:
-            st.error("'일별 국내 & 해외.csv' 파일을 찾을 수 없습니다.")
-            st.stop()
-        except Exception:
-            df = pd.read_csv(file_name, encoding='cp949')
-
-        df.columns = df.columns.str.strip()
-        df['일자'] = pd.to_datetime(df['일자'])
-
-        cols_to_numeric = ['국내발생(명)', '해외유입(명)']
-        for col in cols_to_numeric:
-            df[col] = df[col].astype(str).str.replace(",", "", regex=False)
-            df[col] = df[col].replace("-", "0")
-
-        df[cols_to_numeric] = df[cols_to_numeric].apply(pd.to_numeric)
-        df = df.set_index('일자')
-        
-        df_monthly_sum = df[cols_to_numeric].resample("M").sum()
-        df_smooth = df_monthly_sum.rolling(window=3, min_periods=1).mean()
-
-        st.subheader("📅 3개월 이동평균 · 월별 국내발생 & 해외유입")
-        st.write("**그래프 설명:** 아래 그래프는 국내 발생 및 해외 유입 확진자 수를 월별로 합산하고, 3개월 이동평균을 적용한 추세선입니다.")
-        st.write("---")
-
-        # 그래프 그리기
-        
-        df_plotly = df_smooth.reset_index()
-        
-        fig = px.line(
-            df_plotly,
-            x='일자',
-            y=['국내발생(명)', '해외유입(명)'], 
-            title="월별 국내 발생 및 해외 유입 확진자 수 (3개월 이동평균)",
-            labels={'일자': '월(Month)', 'value': '월별 확진자 수(명)', 'variable': '구분'}
-        )
-
-        fig.update_yaxes(tickformat=",,.0f") 
-        
-        fig.update_traces(
-            hovertemplate="<b>%{x|%Y년 %m월}</b><br>%{data.name}: %{y:,.0f} 명<extra></extra>"
-        )
-                
-        st.plotly_chart(fig, use_container_width=True)
-    
+        moving_average_section()
+
     # 대한민국 감염자 및 사망자
     if show_cfr_k:
-        st.subheader("📌 시도별 누적 확진자 및 사망자")
-
-        # 그래프 설명
-        st.write("**그래프 설명:** 시도별 누적 확진자 수(좌측 축, 10만 명 단위)와 누적 사망자 수(우측 축, 명)를 함께 비교한 이중 축 막대그래프입니다.")
-        st.write("**X축:** 시도명 · **왼쪽 Y축:** 누적 확진자(10만 명) · **오른쪽 Y축:** 누적 사망자(명)")
-        st.write("---")
-
-        plt.rc("font", family="Malgun Gothic")
-        plt.rcParams["axes.unicode_minus"] = False
-
-        # 데이터 전처리
-        file_name = "누적.csv"
-        try:
-            df = pd.read_csv(file_name, encoding="utf-8-sig")
-        except FileNotFoundError:
-            st.error("'누적.csv' 파일을 찾을 수 없습니다.")
-            st.stop()
-        except Exception:
-            df = pd.read_csv(file_name, encoding="cp437") 
-
-        df.columns = df.columns.str.strip()
-        if "계" in df.iloc[0].values:
-            df_cleaned = df.drop(index=0).reset_index(drop=True)
-        else:
-            df_cleaned = df.reset_index(drop=True)
-        df_cleaned = df_cleaned.rename(columns={"시도명": "구분"})
-        cols_to_numeric = ["누적확진자(명)", "누적사망자(명)"]
-        for col in cols_to_numeric:
-            df_cleaned[col] = df_cleaned[col].astype(str).str.replace(",", "", regex=False)
-            df_cleaned[col] = df_cleaned[col].replace("-", "0")
-        df_cleaned[cols_to_numeric] = df_cleaned[cols_to_numeric].apply(pd.to_numeric)
-        df_agg = (
-            df_cleaned.groupby("구분")[["누적확진자(명)", "누적사망자(명)"]]
-            .sum().reset_index()
-        )
-        df_agg = df_agg[df_agg["구분"] != "검역"].copy()
-        df_sorted = df_agg.sort_values(by="누적확진자(명)", ascending=False)
-        
-        # 그래프 그리기 
-        
-        x_indices = np.arange(len(df_sorted))
-        x_labels = df_sorted['구분']
-
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-        
-        fig.add_trace(
-            go.Bar(
-                x=x_indices - 0.2,
-                y=df_sorted['누적확진자(명)'] / 100000, # 10만 단위로 스케일링
-                name='누적 확진자 (10만 명)',
-                marker_color='royalblue',
-                width=0.4,
-                customdata=df_sorted[['구분', '누적확진자(명)']], 
-                hovertemplate="<b>%{customdata[0]}</b><br>누적 확진자: %{customdata[1]:,d} 명<extra></extra>"
-            ),
-            secondary_y=False,
-        )
-
-        fig.add_trace(
-            go.Bar(
-                x=x_indices + 0.2,
-                y=df_sorted['누적사망자(명)'],
-                name='누적 사망자 (명)',
-                marker_color='crimson',
-                width=0.4,
-                customdata=df_sorted[['구분', '누적사망자(명)']],
-                hovertemplate="<b>%{customdata[0]}</b><br>누적 사망자: %{customdata[1]:,d} 명<extra></extra>"
-            ),
-            secondary_y=True,
-        )
-
-        # 4. 레이아웃 및 축 설정
-        fig.update_layout(
-            title_text='시도별 누적 확진자 및 사망자',
-            xaxis=dict(
-                tickmode='array',
-                tickvals=x_indices,
-                ticktext=x_labels
-            ),
-            xaxis_tickangle=0,
-            legend_title_text='범례'
-        )
-        
-        # Y축 제목 설정
-        fig.update_yaxes(title_text="누적 확진자 (10만 명)", secondary_y=False)
-        fig.update_yaxes(title_text="누적 사망자 (명)", secondary_y=True)
-
-        st.plotly_chart(fig, use_container_width=True)
+        with profiling.section("시도별 누적"):
+            st.subheader("📌 시도별 누적 확진자 및 사망자")
+
+            # 그래프 설명
+            st.write("**그래프 설명:** 시도별 누적 확진자 수(좌측 축, 10만 명 단위)와 누적 사망자 수(우측 축, 명)를 함께 비교한 이중 축 막대그래프입니다.")
+            st.write("**X축:** 시도명 · **왼쪽 Y축:** 누적 확진자(10만 명) · **오른쪽 Y축:** 누적 사망자(명)")
+            st.write("---")
+
+            # 시도 합계 행만 사용 (시군구 행까지 더하면 시도마다 두 번 집계됨)
+            df_sorted = (
+                load_region_hierarchy().sido_table()
+                .sort_values(by="누적확진자(명)", ascending=False)
+                .reset_index()
+            )
+
+            # 그래프 그리기
+            fig = precomputed.figure("region_bar", [], lambda: charts.region_dual_bar(df_sorted))
+
+            st.plotly_chart(fig, use_container_width=True)
+
+            sido_drilldown(df_sorted["구분"].tolist())
 
 
     # ================================================================
     # ========================동희님 부분 그래프=========================
     # ================================================================
 
+    # 연령대 묶음·기간은 연령별.csv로 미리 만든 누적합 표에서 바로 계산 (ages.py)
+    def age_controls(key):
+        table = load_age_table()
+        preset = st.selectbox("연령대 묶음", list(BAND_PRESETS), key=f"{key}_bands")
+        start, end = table.date_range()
+        if start < end:
+            start, end = st.slider(
+                "기간", min_value=start, max_value=end, value=(start, end), format="YYYY-MM-DD", key=f"{key}_period"
+            )
+        return table, preset, start, end
 
-    def main():
-
-        df = load_data()
-
-        if show_age_ConfirmedCase:
+    def age_confirmed_section():
+        with profiling.section("연령대별 확진자"):
             # 그래프 설명 추가
             st.markdown("### 👤 연령대별 누적 확진자 수")
             st.write("이 그래프는 국내 코로나19 확진자 수를 연령대별로 집계한 것입니다.")
             st.write("**X축:** 연령대 · **Y축:** 누적 확진자 수(명)")
             st.write("---")
 
-            x = ['0-9세','10-19세','20-29세','30-39세','40-49세','50-59세','60-69세','70-79세','80세이상']
-            y = [3270282, 4246977, 5001143, 5077726, 5237546, 4531012, 3898836, 2056083, 1252949]
-
-            fig, ax = plt.subplots(figsize=(10, 6))
-            ax.bar(x, y)
-            ax.set_xticklabels(x, rotation=45)
-            for p in ax.patches:
-                ax.text(p.get_x() + (p.get_width()/2) ,   # 가로 위치
-                        p.get_y() + p.get_height(),   # 세로 위치
-                        f"{p.get_height()}명",     # 값 + 표시방법 소수 둘째자리까지 
-                        ha = 'center' )   # 좌우정렬 중간으로
-            ax.set_title('연령대별 누적 확진자 수')
-            ax.set_xlabel('연령대')
-            ax.set_ylabel('누적 확진자 수')
-            fig.tight_layout()
-            st.pyplot(fig)
+            table, preset, start, end = age_controls("age_confirmed")
+            totals = table.totals("누적확진자(명)", BAND_PRESETS[preset], start, end)
 
-        if show_age_dead:
+            # 입력이 같으면 캐시된 Plotly 차트를 재사용
+            fig = precomputed.figure("age_confirmed", [preset, start, end], lambda: charts.age_bar(
+                totals.index.tolist(), totals.tolist(), '연령대별 누적 확진자 수', '누적 확진자 수'
+            ))
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption(f"기간: {start} ~ {end}")
+
+    def age_dead_section():
+        with profiling.section("연령대별 사망자"):
             # 설명 추가
             st.markdown("### ⚰️ 연령대별 누적 사망자 수")
             st.write("이 그래프는 국내 코로나19 사망자 수를 연령대별로 집계한 것입니다.")
             st.write("**X축:** 연령대 · **Y축:** 누적 사망자 수(명)")
             st.write("---")
 
-            x_dead = ['0-9세','10-19세','20-29세','30-39세','40-49세','50-59세','60-69세','70-79세','80세이상']
-            y_dead = [38, 24, 73, 160, 473, 1422, 4008, 8062, 21345]
-
-            fig, ax = plt.subplots(figsize=(10, 6))
-            ax.bar(x_dead, y_dead)
-            ax.set_xticklabels(x_dead, rotation=45)
-            for p in ax.patches:
-                ax.text(p.get_x() + (p.get_width()/2) ,   # 가로 위치
-                        p.get_y() + p.get_height(),   # 세로 위치
-                        f"{p.get_height()}명",     # 값 + 표시방법 소수 둘째자리까지 
-                        ha = 'center' )   # 좌우정렬 중간으로
-            ax.set_title('연령대별 사망자 수')
-            ax.set_xlabel('연령대')
-            ax.set_ylabel('사망자 수')
-            fig.tight_layout()
-            st.pyplot(fig)
-        if show_region:
+            table, preset, start, end = age_controls("age_dead")
+            totals = table.totals("누적사망자(명)", BAND_PRESETS[preset], start, end)
+
+            fig = precomputed.figure("age_dead", [preset, start, end], lambda: charts.age_bar(
+                totals.index.tolist(), totals.tolist(), '연령대별 사망자 수', '사망자 수'
+            ))
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption(f"기간: {start} ~ {end}")
+
+    # 지도 종류를 바꾸면 이 지도만 다시 실행
+    @profiling.fragment
+    def region_map_section():
+        with profiling.section("시도별 지도"):
             st.subheader("🗺 시도별 코로나 발생수 지도 산점도")
             st.write("시도별 누적 확진자 수를 기반으로 한반도 지도 위에 산점도로 표현한 그래프입니다.")
             st.write("점의 크기와 색이 누적 확진자 수에 비례합니다.")
 
-            file_name = "누적.csv"
-            try:
-                df_region = pd.read_csv(file_name, encoding="utf-8-sig")
-            except FileNotFoundError:
-                st.error("'누적.csv' 파일을 찾을 수 없습니다.")
-                st.stop()
-            except Exception:
-                df_region = pd.read_csv(file_name, encoding="cp437")
-
-            # 전처리
-            df_region.columns = df_region.columns.str.strip()
-
-            # 첫 행이 '계' 합계 행이면 제거
-            if "계" in df_region.iloc[0].values:
-                df_region = df_region.drop(index=0).reset_index(drop=True)
-
-            df_region = df_region.rename(columns={"시도명": "구분"})
-
-            cols_to_numeric = ["누적확진자(명)"]
-            for col in cols_to_numeric:
-                df_region[col] = df_region[col].astype(str).str.replace(",", "", regex=False)
-                df_region[col] = df_region[col].replace("-", "0")
-            df_region[cols_to_numeric] = df_region[cols_to_numeric].apply(pd.to_numeric)
-
-            # 검역 제외
-            df_region = df_region[df_region["구분"] != "검역"].copy()
-
-            # 시도 중심 좌표 (대략값)
-            region_coords = {
-                "서울": (37.5665, 126.9780),
-                "부산": (35.1796, 129.0756),
-                "대구": (35.8714, 128.6014),
-                "인천": (37.4563, 126.7052),
-                "광주": (35.1595, 126.8526),
-                "대전": (36.3504, 127.3845),
-                "울산": (35.5384, 129.3114),
-                "세종": (36.4800, 127.2890),
-                "경기": (37.4138, 127.5183),
-                "강원": (37.8228, 128.1555),
-                "충북": (36.6357, 127.4913),
-                "충남": (36.5184, 126.8000),
-                "전북": (35.7175, 127.1530),
-                "전남": (34.8679, 126.9910),
-                "경북": (36.4919, 128.8889),
-                "경남": (35.4606, 128.2132),
-                "제주": (33.4996, 126.5312),
-            }
-
-            df_region["lat"] = df_region["구분"].map(lambda x: region_coords.get(x, (None, None))[0])
-            df_region["lon"] = df_region["구분"].map(lambda x: region_coords.get(x, (None, None))[1])
-
-            # 좌표가 없는 행 제거
-            df_region = df_region.dropna(subset=["lat", "lon"])
-
-            # 산점도 지도 생성
-            fig_region = px.scatter_mapbox(
-                df_region,
-                lat="lat",
-                lon="lon",
-                size="누적확진자(명)",
-                color="누적확진자(명)",
-                hover_name="구분",
-                hover_data={"누적확진자(명)": ":,"},
-                size_max=40,
-                zoom=5.8,
-                mapbox_style="carto-positron",
-                color_continuous_scale="Reds",
-            )
+            # 시도 합계 행에 좌표를 미리 join 해 둔 표 (검역·좌표 없는 행 제외)
+            df_region = load_region_hierarchy().sido_geo.reset_index()
 
-            fig_region.update_layout(
-                margin=dict(l=0, r=0, t=0, b=0),
-                coloraxis_colorbar=dict(title="누적 확진자(명)"),
-            )
+            # 시도 경계 GeoJSON이 있으면 경계 지도도 선택 가능 (없으면 산점도만)
+            boundary = geo.load_geojson(geo.KOREA_GEOJSON)
+            map_mode = "산점도"
+            if boundary is not None:
+                map_mode = st.radio("지도 종류", ["산점도", "경계"], horizontal=True)
+
+            if map_mode == "경계":
+                fig_region = charts.region_choropleth_map(
+                    df_region, geo.KOREA_FEATURE_KEY, geo.map_style(), boundary.version, boundary.geojson
+                )
+            else:
+                # 오프라인이면 타일 대신 경계선만 배경으로 그림
+                outline = boundary if geo.OFFLINE and boundary is not None else None
+                params = [geo.map_style(), outline and outline.version]
+                fig_region = precomputed.figure("region_map", params, lambda: charts.region_scatter_map(
+                    df_region, geo.map_style(), outline and outline.version, outline and outline.geojson
+                ))
 
             st.plotly_chart(fig_region, use_container_width=True)
+            if geo.OFFLINE and boundary is None:
+                st.warning(
+                    f"오프라인 지도 모드인데 geodata/{geo.KOREA_GEOJSON} 파일이 없어 "
+                    "배경 지도 없이 점만 표시됩니다."
+                )
+
+    def main():
+
+        # 연령대별 그래프는 둘 다 켜면 탭으로 나누고 열린 탭만 그림
+        age_sections = []
+        if show_age_ConfirmedCase:
+            age_sections.append(("👤 연령대별 확진자", age_confirmed_section))
+        if show_age_dead:
+            age_sections.append(("⚰️ 연령대별 사망자", age_dead_section))
+        if age_sections:
+            render_lazily(age_sections, "age_tab")
+
+        if show_region:
+            region_map_section()
 
 
     if __name__ == "__main__":
         main()
+
+profiling.end()
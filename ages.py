@@ -0,0 +1,104 @@
+"""
+연령별.csv 연령대별 누적 확진자·사망자 집계
+
+연령별.csv는 (일자, 연령대)마다 그날까지의 누적 건수를 담은 긴 형태의 표다.
+AgeTable은 이것을 측정값마다 (날짜 + 1) × (연령대 + 1) 누적합 표 하나로 만들어 둔다.
+- 날짜 축: 원본이 이미 누적 값이므로 날짜마다 이전 값을 이어 채우면 그대로 날짜 누적합
+- 연령대 축: 어린 연령대부터 더한 누적합
+- 0번 행·열은 0 (시작 전 / 가장 어린 연령대 앞)
+
+그래서 임의의 기간 [start, end] × 연령 구간 [lo, hi) 합계가 네 칸의 덧셈·뺄셈으로 나오고,
+구간을 여러 개 물어도 구간 수만큼만 계산한다 (원본 행 수와 무관).
+
+    table = load_age_table()
+    table.totals("누적확진자(명)")                         # 원본 연령대, 전체 기간
+    table.totals("누적사망자(명)", edges=[0, 20, 60])      # 0-19세, 20-59세, 60세이상
+    table.totals("누적확진자(명)", start="2023-01-01")     # 2023년 이후 늘어난 만큼
+"""
+import re
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import data_loader
+import profiling
+
+# 화면에서 고르는 연령대 묶음: 이름 → 구간 경계 (None이면 원본 연령대 그대로)
+BAND_PRESETS = {
+    "10세 단위": None,
+    "20세 단위": [0, 20, 40, 60, 80],
+    "0-19 · 20-59 · 60세이상": [0, 20, 60],
+}
+
+
+def parse_band(label):
+    """"0-9세" → (0, 10), "80세이상" → (80, None)."""
+    match = re.fullmatch(r"(\d+)\s*-\s*(\d+)세", label) or re.fullmatch(r"(\d+)세\s*이상", label)
+    if match is None:
+        raise ValueError(f"연령대 이름을 해석할 수 없습니다: '{label}'")
+    lo = int(match.group(1))
+    return lo, int(match.group(2)) + 1 if match.lastindex == 2 else None
+
+
+def band_label(lo, hi):
+    return f"{lo}세이상" if hi is None else f"{lo}-{hi - 1}세"
+
+
+class AgeTable:
+    def __init__(self, df):
+        bands = sorted(df["연령대"].unique(), key=lambda label: parse_band(label)[0])
+        self.bands = bands
+        self.bounds = [parse_band(label) for label in bands]
+        self.dates = pd.DatetimeIndex(sorted(df["일자"].unique()))
+
+        self.prefix = {}
+        for col in data_loader.AGE_NUM_COLS:
+            # 같은 (일자, 연령대)가 여러 행이면 더함. 빠진 날짜는 직전 누적 값 유지
+            wide = df.pivot_table(index="일자", columns="연령대", values=col, aggfunc="sum", observed=True)
+            wide = wide.reindex(index=self.dates, columns=bands).ffill().fillna(0)
+            table = np.zeros((len(self.dates) + 1, len(bands) + 1), dtype=np.int64)
+            table[1:, 1:] = wide.to_numpy(dtype=np.int64).cumsum(axis=1)
+            self.prefix[col] = table
+
+    def date_range(self):
+        return self.dates[0].date(), self.dates[-1].date()
+
+    def _band_positions(self, edges):
+        # 구간 경계 → 연령대 누적합 열 번호 (경계는 원본 연령대 경계와 맞아야 함)
+        starts = [lo for lo, _ in self.bounds]
+        positions = []
+        for edge in edges:
+            if edge not in starts:
+                raise ValueError(f"{edge}세는 원본 연령대 경계({', '.join(map(str, starts))})가 아닙니다.")
+            positions.append(starts.index(edge))
+        positions.append(len(self.bands))
+        return positions
+
+    def totals(self, column, edges=None, start=None, end=None) -> pd.Series:
+        """[start, end] 기간에 늘어난 건수를 연령 구간별로. edges=None이면 원본 연령대."""
+        table = self.prefix[column]
+        # 행 번호: 0은 시작 전, k는 k번째 날짜까지의 누적
+        lo_row = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start), side="left")
+        hi_row = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end), side="right")
+        by_band = table[hi_row] - table[lo_row]
+
+        if edges is None:
+            return pd.Series(np.diff(by_band), index=self.bands, name=column)
+        positions = self._band_positions(edges)
+        values = by_band[positions[1:]] - by_band[positions[:-1]]
+        labels = [
+            band_label(edge, None if i == len(edges) - 1 else edges[i + 1])
+            for i, edge in enumerate(edges)
+        ]
+        return pd.Series(values, index=labels, name=column)
+
+
+@profiling.cached(st.cache_resource(show_spinner=False, max_entries=2))
+def _cached_age_table(path, mtime):
+    return AgeTable(data_loader.load_dataset("age", path, mtime))
+
+
+def load_age_table():
+    path = data_loader.data_path(data_loader.AGE_CSV)
+    return _cached_age_table(path, data_loader.source_mtime(path))
@@ -0,0 +1,115 @@
+"""
+연령대별 차트 벤치마크: 기존 matplotlib 경로 vs 캐시된 Plotly 경로
+
+- rerun_ms     : rerun 한 번당 차트 처리 시간 (matplotlib: 그리기 + PNG 저장 / Plotly: 캐시 조회 + to_json)
+- rss_growth_mb: 1000번 rerun 후 RSS 증가량 (기존 코드는 figure를 닫지 않았음)
+- import_ms    : 대시보드가 더 이상 import하지 않는 matplotlib.pyplot + font_manager의 import 시간
+                 (Plotly는 다른 차트 때문에 이미 import되어 있어 추가 비용 없음)
+
+각 항목은 별도 프로세스에서 측정한다. (Linux 전용, matplotlib 설치 필요)
+
+    python bench/age_charts.py
+    python bench/age_charts.py --reruns 200 --output age.json
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BANDS = ['0-9세', '10-19세', '20-29세', '30-39세', '40-49세', '50-59세', '60-69세', '70-79세', '80세이상']
+VALUES = [3270282, 4246977, 5001143, 5077726, 5237546, 4531012, 3898836, 2056083, 1252949]
+
+
+def _rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def _legacy_rerun(plt):
+    # 기존 코드와 같은 방식 (figure를 닫지 않음), st.pyplot처럼 PNG로 저장
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.bar(BANDS, VALUES)
+    ax.set_xticks(range(len(BANDS)))
+    ax.set_xticklabels(BANDS, rotation=45)
+    for p in ax.patches:
+        ax.text(p.get_x() + (p.get_width() / 2), p.get_y() + p.get_height(), f"{p.get_height()}명", ha='center')
+    ax.set_title('연령대별 누적 확진자 수')
+    fig.tight_layout()
+    fig.savefig(io.BytesIO(), format="png")
+
+
+def run_child(method, reruns):
+    if method == "matplotlib":
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        def rerun():
+            _legacy_rerun(plt)
+    else:
+        import plotly.io as pio
+
+        import charts
+
+        def rerun():
+            fig = charts.age_bar(BANDS, VALUES, '연령대별 누적 확진자 수', '누적 확진자 수')
+            pio.to_json(fig, validate=False)
+
+    rerun()  # 첫 호출(폰트 로딩, 캐시 채우기)은 제외
+    before = _rss_mb()
+    start = time.perf_counter()
+    for _ in range(reruns):
+        rerun()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "method": method,
+        "rerun_ms": round(elapsed / reruns * 1000, 3),
+        "rss_growth_mb": round(_rss_mb() - before, 1),
+    }
+
+
+def import_ms(statement):
+    code = f"import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True, text=True)
+    return round(float(out.stdout.strip().splitlines()[-1]) * 1000, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reruns", type=int, default=1000)
+    parser.add_argument("--output", help="결과를 JSON으로 저장할 경로")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.reruns)))
+        return
+
+    results = []
+    for method in ["matplotlib", "plotly"]:
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", method, "--reruns", str(args.reruns)],
+            check=True, capture_output=True, text=True,
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(f"{method:<11} rerun {result['rerun_ms']:9.3f} ms  RSS +{result['rss_growth_mb']:7.1f} MB / {args.reruns}회")
+
+    saved_import = import_ms("import matplotlib.pyplot, matplotlib.font_manager")
+    results.append({"method": "matplotlib", "import_ms": saved_import})
+    print(f"스크립트 import에서 빠진 시간 (matplotlib.pyplot + font_manager): {saved_import:.1f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+숫자 컬럼 정리 벤치마크: 기존 방식 vs data_loader.parse_counts
+
+번들 CSV의 데이터 행을 반복해서 N행짜리 합성 CSV를 만든 뒤, 방식마다 별도 프로세스에서
+읽기 + 정리를 실행해 소요 시간과 최대 메모리 증가량(ru_maxrss - 시작 시 RSS)을 잰다. (Linux 전용)
+
+- legacy       : 기존 코드 (astype(str) → str.replace(",") → replace("-") → to_numeric, 컬럼별)
+- read_time    : read_csv(thousands=",")로 읽으면서 바로 숫자로 파싱 (대시보드가 쓰는 경로)
+- string_parse : 문자열로 읽은 뒤 parse_counts의 벡터화 파서로 변환
+
+    python bench/clean_numeric.py                  # 10,000,000행
+    python bench/clean_numeric.py --rows 1000000 --output clean.json
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+import data_loader  # noqa: E402
+
+METHODS = ["legacy", "read_time", "string_parse"]
+NUM_COLS = {
+    "worldwide": data_loader.WORLD_NUM_COLS,
+    "cumulative": data_loader.CUMULATIVE_NUM_COLS,
+    "daily": data_loader.DAILY_NUM_COLS,
+    "age": data_loader.AGE_NUM_COLS,
+}
+
+
+def make_synthetic(source_path, rows, target_path):
+    # 헤더는 그대로 두고 데이터 행만 rows개가 될 때까지 반복
+    with open(source_path, encoding=data_loader.detect_encoding(source_path)) as f:
+        df = pd.read_csv(f, dtype=str, keep_default_na=False)
+    reps = -(-rows // len(df))
+    big = pd.concat([df] * reps, ignore_index=True).iloc[:rows]
+    big.to_csv(target_path, index=False, encoding="utf-8-sig")
+
+
+def _legacy(name, path):
+    if name == "worldwide":
+        df = pd.read_csv(path, na_values=["N/A"])
+        df = df.dropna()
+        for col in data_loader.WORLD_NUM_COLS:
+            df[col] = df[col].astype(str).str.replace(",", "", regex=False).str.strip()
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        return df
+
+    cols = NUM_COLS[name]
+    df = pd.read_csv(path, encoding=data_loader.detect_encoding(path))
+    df.columns = df.columns.str.strip()
+    for col in cols:
+        df[col] = df[col].astype(str).str.replace(",", "", regex=False)
+        df[col] = df[col].replace("-", "0")
+    df[cols] = df[cols].apply(pd.to_numeric)
+    return df
+
+
+def _string_parse(name, path):
+    cols = NUM_COLS[name]
+    df = pd.read_csv(path, encoding=data_loader.detect_encoding(path), dtype={col: str for col in cols})
+    df.columns = df.columns.str.strip()
+    if name == "worldwide":
+        df = df.dropna()
+    for col in cols:
+        df[col] = data_loader.parse_counts(df[col], dash_as_zero=name != "worldwide")
+    return df
+
+
+def _current_rss_kb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def run_child(name, method, path):
+    run = {
+        "legacy": _legacy,
+        "read_time": lambda n, p: data_loader.DATASETS[n][1](p),
+        "string_parse": _string_parse,
+    }[method]
+
+    before = _current_rss_kb()
+    start = time.perf_counter()
+    df = run(name, path)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {
+        "dataset": name,
+        "method": method,
+        "rows": len(df),
+        "seconds": round(elapsed, 4),
+        "peak_mb": round((peak - before) / 1024, 1),
+        "frame_mb": round(df.memory_usage(deep=True).sum() / 2**20, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--datasets", nargs="*", default=list(data_loader.DATASETS))
+    parser.add_argument("--output", help="결과를 JSON으로 저장할 경로")
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(*args.child)))
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.datasets:
+            file_name = data_loader.DATASETS[name][0]
+            path = os.path.join(tmp, file_name)
+            make_synthetic(data_loader.data_path(file_name), args.rows, path)
+
+            for method in METHODS:
+                out = subprocess.run(
+                    [sys.executable, __file__, "--child", name, method, path],
+                    check=True, capture_output=True, text=True,
+                )
+                result = json.loads(out.stdout.strip().splitlines()[-1])
+                results.append(result)
+                print(
+                    f"{name:<11} {method:<13} {result['rows']:>11,}행 "
+                    f"{result['seconds']:8.2f} s  peak +{result['peak_mb']:8.1f} MB  "
+                    f"frame {result['frame_mb']:8.1f} MB"
+                )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+시계열 다운샘플링 벤치마크: 원본 전송 vs LTTB / Min-Max
+
+합성 일별 시계열(랜덤 워크, 두 컬럼)을 점 개수별로 만들고, 방식마다
+- reduce_ms : 다운샘플링 시간
+- build_ms  : charts.trend_line figure 생성 시간 (캐시 미스)
+- json_ms   : plotly.io.to_json 직렬화 시간 (st.plotly_chart가 하는 일)
+- parse_ms  : json.loads 시간 (브라우저가 payload를 읽는 비용의 근사치)
+- payload_kb: 브라우저로 보내는 figure JSON 크기
+를 잰다. 실제 브라우저 그리기 시간은 헤드리스 환경에서 잴 수 없어 payload 크기와 점 개수로 갈음한다.
+원본 전송은 점이 --raw-limit개를 넘으면 (메모리·시간이 너무 커서) 건너뛴다.
+
+    python bench/downsample.py
+    python bench/downsample.py --points 1000 100000 10000000 --raw-limit 10000000 --output ds.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import plotly.io as pio  # noqa: E402
+
+import charts  # noqa: E402
+from downsample import TARGET_POINTS, downsample_frame  # noqa: E402
+
+
+def make_series(points, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("1900-01-01", periods=points, freq="min", name="일자")
+    walk = np.abs(np.cumsum(rng.normal(0, 100, size=(points, 2)), axis=0))
+    return pd.DataFrame(walk, index=index, columns=["국내발생(명)", "해외유입(명)"])
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def measure(df, method, target):
+    if method == "raw":
+        reduced, reduce_ms = df, 0.0
+    else:
+        reduced, reduce_ms = _timed(lambda: downsample_frame(df, target, method))
+
+    charts.trend_line.clear()
+    fig, build_ms = _timed(lambda: charts.trend_line(reduced, "bench", "x", "y", "%Y-%m-%d"))
+    spec, json_ms = _timed(lambda: pio.to_json(fig, validate=False))
+    _, parse_ms = _timed(lambda: json.loads(spec))
+
+    return {
+        "points": len(df),
+        "method": method,
+        "sent_rows": len(reduced),
+        "reduce_ms": round(reduce_ms, 1),
+        "build_ms": round(build_ms, 1),
+        "json_ms": round(json_ms, 1),
+        "parse_ms": round(parse_ms, 1),
+        "payload_kb": round(len(spec) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, nargs="*", default=[1_000, 100_000, 10_000_000])
+    parser.add_argument("--target", type=int, default=TARGET_POINTS)
+    parser.add_argument("--raw-limit", type=int, default=1_000_000)
+    parser.add_argument("--output", help="결과를 JSON으로 저장할 경로")
+    args = parser.parse_args()
+
+    measure(make_series(100), "raw", args.target)  # plotly 초기화 비용은 제외
+
+    results = []
+    header = f"{'points':>11} {'method':<7} {'sent':>8} {'reduce':>9} {'build':>9} {'to_json':>9} {'parse':>9} {'payload':>11}"
+    print(header)
+    for points in args.points:
+        df = make_series(points)
+        for method in ["raw", "lttb", "minmax"]:
+            if method == "raw" and points > args.raw_limit:
+                print(f"{points:>11,} {'raw':<7} (건너뜀: --raw-limit {args.raw_limit:,})")
+                continue
+            r = measure(df, method, args.target)
+            results.append(r)
+            print(
+                f"{r['points']:>11,} {r['method']:<7} {r['sent_rows']:>8,} {r['reduce_ms']:7.1f}ms "
+                f"{r['build_ms']:7.1f}ms {r['json_ms']:7.1f}ms {r['parse_ms']:7.1f}ms {r['payload_kb']:9.1f}KB"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
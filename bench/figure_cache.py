@@ -0,0 +1,108 @@
+"""
+차트별 생성 시간 리포트: 캐시 미스(새로 생성) vs 캐시 히트
+
+charts.py의 차트 함수마다
+- build_ms : 캐시를 비운 뒤 처음 호출 (figure 생성)
+- hit_ms   : 같은 입력으로 다시 호출 (인자 해시 + 캐시 조회)
+- json_ms  : plotly.io.to_json (st.plotly_chart가 매 rerun마다 하는 직렬화)
+- json_kb  : 직렬화된 figure 크기
+를 측정한다. 캐시 히트 시 rerun마다 절약되는 시간은 build_ms - hit_ms 이다.
+
+    python bench/figure_cache.py
+    python bench/figure_cache.py --repeat 20 --output figures.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import plotly.io as pio  # noqa: E402
+
+import charts  # noqa: E402
+import data_loader  # noqa: E402
+from metrics import top_n  # noqa: E402
+from regions import RegionHierarchy  # noqa: E402
+
+
+def chart_inputs(world=None, daily=None, cumulative=None, coords=None):
+    # 프레임을 넘기지 않으면 번들 데이터를 읽음 (bench/stages.py는 합성 데이터를 넘김)
+    world = data_loader.read_dataset("worldwide") if world is None else world
+    daily = data_loader.read_dataset("daily") if daily is None else daily
+    cumulative = data_loader.read_dataset("cumulative") if cumulative is None else cumulative
+
+    df_smooth = daily[data_loader.DAILY_NUM_COLS].resample("M").sum().rolling(window=3, min_periods=1).mean()
+    hierarchy = RegionHierarchy(cumulative, coords)
+    df_sorted = hierarchy.sido_table().sort_values(by="누적확진자(명)", ascending=False).reset_index()
+    df_region = hierarchy.sido_geo.reset_index()
+
+    return {
+        "cases_ratio_bar": (charts.cases_ratio_bar, (top_n(world, "Cases per 100k"), "title")),
+        "percent_ranking_bar": (
+            charts.percent_ranking_bar,
+            (top_n(world, "CFR (%)"), "CFR (%)", "Total Deaths", "Case Fatality Rate (%)", "title"),
+        ),
+        "world_choropleth": (charts.world_choropleth, (world,)),
+        "trend_line": (
+            charts.trend_line,
+            (df_smooth, "월별 국내 발생 및 해외 유입 확진자 수 (3개월 이동평균)", "월(Month)", "월별 확진자 수(명)"),
+        ),
+        "region_dual_bar": (charts.region_dual_bar, (df_sorted,)),
+        "region_scatter_map": (charts.region_scatter_map, (df_region,)),
+    }
+
+
+def _median_ms(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def measure(name, builder, args, repeat):
+    def cold():
+        builder.clear()
+        return builder(*args)
+
+    build_ms, fig = _median_ms(cold, repeat)
+    hit_ms, _ = _median_ms(lambda: builder(*args), repeat)
+    json_ms, spec = _median_ms(lambda: pio.to_json(fig, validate=False), repeat)
+
+    return {
+        "chart": name,
+        "build_ms": round(build_ms, 2),
+        "hit_ms": round(hit_ms, 3),
+        "saved_ms": round(build_ms - hit_ms, 2),
+        "json_ms": round(json_ms, 2),
+        "json_kb": round(len(spec) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="결과를 JSON으로 저장할 경로")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'chart':<22} {'build':>9} {'hit':>9} {'saved':>9} {'to_json':>9} {'size':>9}")
+    for name, (builder, builder_args) in chart_inputs().items():
+        r = measure(name, builder, builder_args, args.repeat)
+        results.append(r)
+        print(
+            f"{name:<22} {r['build_ms']:7.2f}ms {r['hit_ms']:7.3f}ms {r['saved_ms']:7.2f}ms "
+            f"{r['json_ms']:7.2f}ms {r['json_kb']:7.1f}KB"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+전 세계 프레임 메모리 리포트: 기존 load_data() 방식 vs 현재 read_worldwide()
+
+컬럼별 memory_usage(deep=True)를 나란히 출력하고, 캐시된 프레임에서 잘라 쓴 프레임
+(지도용 컬럼 선택, 행 범위 자르기)이 원본과 메모리를 공유하는지(복사가 없는지)도 확인한다.
+
+- before : 기존 코드 (Serial Number 포함, Country는 object, 숫자는 to_numeric 결과)
+- after  : data_loader.read_worldwide (Serial Number 제외, Arrow 문자열, 가장 작은 정수형)
+
+    python bench/frame_memory.py
+    python bench/frame_memory.py --scale 1000 --output memory.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import data_loader  # noqa: E402
+from clean_numeric import make_synthetic  # noqa: E402
+
+
+def _legacy_world(path):
+    df = pd.read_csv(path, na_values=["N/A"])
+    df.columns = df.columns.str.strip()
+    df["Country"] = df["Country"].astype(str).str.strip()
+    df = df.dropna()
+    for col in data_loader.WORLD_NUM_COLS:
+        df[col] = df[col].astype(str).str.replace(",", "", regex=False).str.strip()
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df.dropna(subset=data_loader.WORLD_NUM_COLS)
+
+
+def _shares(view, df, col):
+    return bool(np.shares_memory(view[col].values, df[col].values))
+
+
+def report(path):
+    before = _legacy_world(path)
+    after = data_loader.read_worldwide(path)
+    usage = pd.DataFrame(
+        {"before": before.memory_usage(deep=True), "after": after.memory_usage(deep=True)}
+    ).fillna(0).astype(np.int64)
+    order = ["Index", *before.columns, *after.columns.difference(before.columns, sort=False)]
+    usage = usage.loc[order]
+    usage.loc["합계"] = usage.sum()
+    dtypes = {"before": before.dtypes.astype(str).to_dict(), "after": after.dtypes.astype(str).to_dict()}
+
+    # 컬럼 선택·행 범위 자르기는 뷰 (head()와 top_n은 고른 몇 행만 복사)
+    views = {
+        "map_columns": _shares(after[["Country", "ISO3", "Total Cases"]], after, "Total Cases"),
+        "row_slice": _shares(after.iloc[:50], after, "Total Cases"),
+    }
+    return usage, dtypes, views
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=1, help="번들 CSV 행을 몇 배로 늘려 잴지")
+    parser.add_argument("--output", help="결과를 JSON으로 저장할 경로")
+    args = parser.parse_args()
+
+    source = data_loader.data_path(data_loader.WORLD_CSV)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = source
+        if args.scale > 1:
+            path = os.path.join(tmp, "world.csv")
+            make_synthetic(source, len(pd.read_csv(source)) * args.scale, path)
+        usage, dtypes, views = report(path)
+
+    print(f"{'column':<20} {'before':>12} {'after':>12}  dtype (before → after)")
+    for col, row in usage.iterrows():
+        dtype = f"{dtypes['before'].get(col, '-')} → {dtypes['after'].get(col, '-')}" if col != "합계" else ""
+        print(f"{str(col):<20} {row['before']:>12,} {row['after']:>12,}  {dtype}")
+    ratio = usage.loc["합계", "after"] / usage.loc["합계", "before"]
+    print(f"\n현재/기존 = {ratio:.2f}")
+    print("원본과 메모리 공유(복사 없음): " + ", ".join(f"{k}={v}" for k, v in views.items()))
+
+    if args.output:
+        result = {
+            "scale": args.scale,
+            "bytes": {col: row.to_dict() for col, row in usage.iterrows()},
+            "dtypes": dtypes,
+            "views": views,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2, default=int)
+
+
+if __name__ == "__main__":
+    main()
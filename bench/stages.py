@@ -0,0 +1,341 @@
+"""
+대시보드 단계별 벤치마크 (브라우저 없이 실행)
+
+번들 CSV를 --scales 배(1 ~ 10000)로 늘린 합성 데이터를 만들고, 배율마다
+1) 단계별 측정: 읽기·정리(load) → 스냅샷(snapshot) → 변환(transform) → 차트 생성(render)
+   - ms      : --repeat 회 실행의 중앙값
+   - peak_mb : tracemalloc으로 잰 그 단계만의 최대 할당량 (시간 측정과 별도로 한 번 더 실행)
+2) 화면 측정 (--app): Streamlit AppTest로 사이드바 옵션 조합마다 스크립트 전체 실행 시간
+   - cold_ms : 모든 캐시를 비운 뒤 첫 실행
+   - warm_ms : 같은 옵션으로 다시 실행 (캐시 히트)
+   - 조합: single = 옵션 하나씩 + 전부, all = 가능한 모든 조합
+을 재서 JSON으로 저장한다. 결과에는 git 커밋이 기록되므로 --compare로 이전 결과와 비교할 수 있다.
+
+    python bench/stages.py
+    python bench/stages.py --scales 1 10 100 1000 --app --output stages.json
+    python bench/stages.py --scales 1 10 --compare old.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+import plotly.io as pio  # noqa: E402
+
+import data_loader  # noqa: E402
+import geo  # noqa: E402
+import snapshot  # noqa: E402
+import timeseries  # noqa: E402
+from ages import AgeTable  # noqa: E402
+from clean_numeric import make_synthetic  # noqa: E402
+from downsample import TARGET_POINTS, downsample_frame  # noqa: E402
+from figure_cache import chart_inputs  # noqa: E402
+from metrics import top_n  # noqa: E402
+from regions import RegionHierarchy  # noqa: E402
+
+APP = os.path.join(ROOT, "Covid_Dashboard_v2.py")
+
+# 기존 화면 코드와 같은 resample("M")을 재므로 pandas의 'ME' 권고 경고는 숨김
+warnings.simplefilter("ignore", FutureWarning)
+
+# 화면 조합: (켜는 데이터 체크박스, 옵션 체크박스 목록)
+APP_SECTIONS = {
+    "world": (
+        "Worldwide Data",
+        [
+            "데이터 미리보기",
+            "인구수 대비 감염자 비율(상위 N개국)",
+            "감염자 대비 사망자 비율(상위 N개국)",
+            "감염자 대비 회복인원 비율(하위 N개국)",
+            "전 세계 누적 확진자 지도",
+        ],
+    ),
+    "korea": (
+        "South Korea Data",
+        [
+            "3개월 이동평균 · 월별 국내발생 & 해외유입",
+            "누적 확진자 및 사망자",
+            "연령대별 누적 확진자 수",
+            "연령대별 누적 사망자 수",
+            "시도별 코로나 발생수 지도 산점도",
+        ],
+    ),
+}
+
+
+# ===========================================================================================================================
+# 합성 데이터
+# ===========================================================================================================================
+
+def build_data(data_dir, scale):
+    rows = {}
+    for name, (file_name, _) in data_loader.DATASETS.items():
+        source = data_loader.data_path(file_name)
+        base = len(pd.read_csv(source, encoding="utf-8-sig"))
+        target = os.path.join(data_dir, file_name)
+        make_synthetic(source, base * scale, target)
+        rows[name] = base * scale
+    return rows
+
+
+# ===========================================================================================================================
+# 단계
+# ===========================================================================================================================
+
+def stage_list(data_dir, work_dir):
+    """(단계 이름, 함수) 목록. 함수는 ctx(앞 단계 결과)를 받아 결과를 돌려준다."""
+    paths = {name: os.path.join(data_dir, file_name) for name, (file_name, _) in data_loader.DATASETS.items()}
+    snapshot_dir = os.path.join(work_dir, "snapshot")
+    store_dir = os.path.join(work_dir, "daily_store")
+
+    def write_snapshots(ctx):
+        for name in data_loader.DATASETS:
+            snapshot.write_snapshot(
+                name, ctx[f"load.{name}"], paths[name], data_loader.SCHEMA_VERSION, snapshot_dir,
+                deps=data_loader.dataset_deps(name),
+            )
+
+    def daily_store(ctx):
+        # 매번 처음부터 만들도록 상태를 지움
+        for file_name in os.listdir(store_dir) if os.path.isdir(store_dir) else []:
+            os.remove(os.path.join(store_dir, file_name))
+        timeseries.update_daily_store(paths["daily"], store_dir)
+
+    stages = [(f"load.{name}", lambda ctx, name=name, reader=reader: reader(paths[name]))
+              for name, (_, reader) in data_loader.DATASETS.items()]
+    stages += [
+        ("snapshot.write", write_snapshots),
+        *[
+            (f"snapshot.read.{name}",
+             lambda ctx, name=name: snapshot.read_snapshot(
+                 name, paths[name], data_loader.SCHEMA_VERSION, snapshot_dir, deps=data_loader.dataset_deps(name)
+             ))
+            for name in data_loader.DATASETS
+        ],
+        ("ingest.daily_store", daily_store),
+        ("transform.top_n", lambda ctx: [
+            top_n(ctx["load.worldwide"], "Cases per 100k"),
+            top_n(ctx["load.worldwide"], "CFR (%)"),
+            top_n(ctx["load.worldwide"], "Recovered (%)", ascending=True),
+        ]),
+        ("transform.regions", lambda ctx: RegionHierarchy(ctx["load.cumulative"], ctx["coords"])),
+        ("transform.age_table", lambda ctx: AgeTable(ctx["load.age"])),
+        ("transform.resample_rolling", lambda ctx: (
+            ctx["load.daily"][data_loader.DAILY_NUM_COLS].resample("M").sum().rolling(window=3, min_periods=1).mean()
+        )),
+        ("transform.cube", lambda ctx: timeseries.AggregationCube(ctx["load.daily"])),
+        ("transform.downsample", lambda ctx: downsample_frame(
+            ctx["transform.cube"].slice("일", 7), TARGET_POINTS, "lttb"
+        )),
+    ]
+    return stages
+
+
+def render_stages(ctx):
+    inputs = chart_inputs(ctx["load.worldwide"], ctx["load.daily"], ctx["load.cumulative"], ctx["coords"])
+
+    def render(builder, args):
+        builder.clear()
+        return pio.to_json(builder(*args), validate=False)
+
+    render(*next(iter(inputs.values())))  # plotly 초기화 비용은 제외
+    return [(f"render.{name}", lambda ctx, b=builder, a=args: render(b, a)) for name, (builder, args) in inputs.items()]
+
+
+def measure(func, ctx, repeat, memory):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(ctx)
+        times.append((time.perf_counter() - start) * 1000)
+
+    peak_mb = None
+    if memory:
+        tracemalloc.start()
+        func(ctx)
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return result, statistics.median(times), peak_mb
+
+
+def run_stages(scale, data_dir, work_dir, repeat, memory):
+    ctx = {"coords": geo.read_region_coords(geo.geo_path(geo.KOREA_COORDS))}
+    results = []
+
+    def run(stage_items):
+        for stage, func in stage_items:
+            ctx[stage], ms, peak_mb = measure(func, ctx, repeat, memory)
+            results.append({
+                "scale": scale,
+                "stage": stage,
+                "ms": round(ms, 2),
+                "peak_mb": None if peak_mb is None else round(peak_mb, 2),
+            })
+            peak = "" if peak_mb is None else f"  peak {peak_mb:9.2f} MB"
+            print(f"  {stage:<32} {ms:10.2f} ms{peak}", flush=True)
+
+    run(stage_list(data_dir, work_dir))
+    run(render_stages(ctx))
+    return results
+
+
+# ===========================================================================================================================
+# 화면 (AppTest)
+# ===========================================================================================================================
+
+def option_sets(mode):
+    for section, (base, options) in APP_SECTIONS.items():
+        if mode == "all":
+            combos = [c for k in range(1, len(options) + 1) for c in itertools.combinations(options, k)]
+        else:
+            combos = [(option,) for option in options] + [tuple(options)]
+        for combo in combos:
+            yield section, base, combo
+
+
+def _check(at, label):
+    for checkbox in at.sidebar.checkbox:
+        if checkbox.label == label:
+            checkbox.check()
+            return
+    raise KeyError(label)
+
+
+def run_app_child(mode):
+    # 자식 프로세스: COVID_DATA_DIR / COVID_SNAPSHOT_DIR가 합성 데이터 폴더를 가리킴
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    # 모듈 import·plotly 초기화 비용은 제외
+    warmup = AppTest.from_file(APP, default_timeout=3600)
+    warmup.run()
+    for base, options in APP_SECTIONS.values():
+        _check(warmup, base)
+        warmup.run()
+        for label in options:
+            _check(warmup, label)
+        warmup.run()
+
+    results = []
+    for section, base, combo in option_sets(mode):
+        at = AppTest.from_file(APP, default_timeout=3600)
+        at.run()
+        _check(at, base)
+        at.run()
+        for label in combo:
+            _check(at, label)
+
+        st.cache_data.clear()
+        st.cache_resource.clear()
+        start = time.perf_counter()
+        at.run()
+        cold_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        at.run()
+        warm_ms = (time.perf_counter() - start) * 1000
+
+        results.append({
+            "section": section,
+            "options": list(combo),
+            "cold_ms": round(cold_ms, 1),
+            "warm_ms": round(warm_ms, 1),
+            "exceptions": [e.message for e in at.exception],
+        })
+    return results
+
+
+def run_app(scale, data_dir, work_dir, mode):
+    env = dict(os.environ, COVID_DATA_DIR=data_dir, COVID_SNAPSHOT_DIR=os.path.join(work_dir, "app_snapshot"))
+    out = subprocess.run(
+        [sys.executable, __file__, "--app-child", mode],
+        check=True, capture_output=True, text=True, env=env,
+    )
+    results = json.loads(out.stdout.strip().splitlines()[-1])
+    for r in results:
+        r["scale"] = scale
+        flag = "  예외: " + "; ".join(r["exceptions"]) if r["exceptions"] else ""
+        print(f"  app.{r['section']:<6} {' + '.join(r['options'])[:60]:<60} "
+              f"cold {r['cold_ms']:9.1f} ms  warm {r['warm_ms']:8.1f} ms{flag}", flush=True)
+    return results
+
+
+# ===========================================================================================================================
+# 결과
+# ===========================================================================================================================
+
+def metadata(args):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "args": vars(args),
+    }
+
+
+def compare(results, old_path):
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    before = {(r["scale"], r["stage"]): r["ms"] for r in old["stages"]}
+    print(f"\n{old_path} ({old['meta'].get('commit')}) 대비")
+    for r in results["stages"]:
+        prev = before.get((r["scale"], r["stage"]))
+        if prev:
+            print(f"  x{r['scale']:<6} {r['stage']:<32} {prev:10.2f} → {r['ms']:10.2f} ms  ({r['ms'] / prev:5.2f}배)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="*", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="tracemalloc 측정 생략 (큰 배율에서 시간 절약)")
+    parser.add_argument("--app", choices=["single", "all"], nargs="?", const="single", help="AppTest 화면 측정")
+    parser.add_argument("--output", help="결과를 JSON으로 저장할 경로")
+    parser.add_argument("--compare", help="이전 결과 JSON과 단계별 시간 비교")
+    parser.add_argument("--app-child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.app_child:
+        print(json.dumps(run_app_child(args.app_child), ensure_ascii=False))
+        return
+
+    results = {"meta": metadata(args), "rows": {}, "stages": [], "app": []}
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = os.path.join(tmp, "data")
+            os.makedirs(data_dir)
+            rows = build_data(data_dir, scale)
+            results["rows"][scale] = rows
+            print(f"x{scale}: " + ", ".join(f"{name} {n:,}행" for name, n in rows.items()), flush=True)
+
+            results["stages"] += run_stages(scale, data_dir, tmp, args.repeat, not args.no_memory)
+            if args.app:
+                results["app"] += run_app(scale, data_dir, tmp, args.app)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+대시보드 차트 미리 만들기
+
+Covid_Dashboard_v2.py를 브라우저 없이(Streamlit AppTest) 모든 옵션을 켠 기본 설정으로 한 번 실행하면서,
+화면 코드가 precomputed.figure()로 그리는 차트를 모두 Plotly JSON으로 저장하고 정적 HTML을 만든다.
+화면 코드를 그대로 실행하므로 대시보드와 같은 입력·같은 설정으로 만들어진다.
+
+    python build.py                 # → build/
+    python build.py --output /srv/covid-static
+
+결과 폴더는 임시 폴더에 만든 뒤 통째로 교체하므로, 실행 중인 대시보드(COVID_PRECOMPUTED_DIR)가
+반쯤 만들어진 결과를 읽지 않는다. index.html과 plotly.min.js는 어느 정적 웹 서버로든 제공할 수 있다.
+"""
+import argparse
+import html
+import json
+import os
+import shutil
+import sys
+import time
+
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+import data_loader
+import precomputed
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(ROOT, "Covid_Dashboard_v2.py")
+
+
+def render_app(timeout=120):
+    """모든 데이터·옵션 체크박스를 켜고 스크립트를 실행한다. 오류가 나면 RuntimeError."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    at.run()
+    # 첫 실행에는 데이터 체크박스만 있고, 켜면 옵션 체크박스가 생김
+    for _ in range(2):
+        for checkbox in at.sidebar.checkbox:
+            checkbox.check()
+        at.run()
+
+    problems = [e.value for e in at.exception] + [e.value for e in at.error]
+    if problems:
+        raise RuntimeError("대시보드 실행 중 오류: " + "; ".join(map(str, problems)))
+
+
+def write_html(folder, views, built):
+    sections = []
+    for file_name, view in views.items():
+        with open(os.path.join(folder, file_name), encoding="utf-8") as f:
+            fig = pio.from_json(f.read())
+        sections.append(
+            f'<section id="{view["name"]}">\n<h2>{html.escape(view["title"])}</h2>\n'
+            + fig.to_html(full_html=False, include_plotlyjs=False)
+            + "\n</section>"
+        )
+
+    with open(os.path.join(folder, "plotly.min.js"), "w", encoding="utf-8") as f:
+        f.write(get_plotlyjs())
+    with open(os.path.join(folder, "index.html"), "w", encoding="utf-8") as f:
+        f.write(
+            '<!DOCTYPE html>\n<html lang="ko">\n<head>\n<meta charset="utf-8">\n'
+            "<title>COVID-19 Dashboard</title>\n"
+            '<script src="plotly.min.js"></script>\n</head>\n<body>\n'
+            f"<h1>COVID-19 Dashboard</h1>\n<p>생성 시각: {built}</p>\n"
+            + "\n".join(sections)
+            + "\n</body>\n</html>\n"
+        )
+
+
+def build(output):
+    output = os.path.abspath(output)
+    tmp = f"{output}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    stamps = precomputed.source_stamps()
+    precomputed.start_recording(tmp)
+    try:
+        render_app()
+    finally:
+        views = precomputed.stop_recording()
+    if precomputed.source_stamps() != stamps:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise RuntimeError("만드는 동안 원본 파일이 바뀌었습니다. 다시 실행하세요.")
+
+    built = time.strftime("%Y-%m-%dT%H:%M:%S")
+    write_html(tmp, views, built)
+    # manifest는 마지막에 (대시보드는 manifest에 있는 차트만 사용)
+    with open(os.path.join(tmp, precomputed.MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(
+            {"built": built, "schema": data_loader.SCHEMA_VERSION, "sources": stamps, "views": views},
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+
+    # 폴더 통째로 교체 (교체하는 짧은 동안에는 대시보드가 차트를 새로 만듦)
+    old = f"{output}.{os.getpid()}.old"
+    if os.path.exists(output):
+        os.replace(output, old)
+    os.replace(tmp, output)
+    shutil.rmtree(old, ignore_errors=True)
+    return output, views
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=os.path.join(ROOT, "build"), help="결과 폴더")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    output, views = build(args.output)
+    for file_name, view in views.items():
+        print(f"{view['name']:<14} {file_name}")
+    print(f"차트 {len(views)}개, {(time.perf_counter() - start):.1f} s → {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,245 @@
+"""
+대시보드 Plotly 차트 생성 함수
+
+사이드바 위젯을 바꿀 때마다 스크립트 전체가 다시 실행되므로, 차트는 입력 데이터와
+파라미터가 같으면 다시 만들지 않도록 st.cache_resource로 캐시한다.
+- 캐시 키: Streamlit이 계산하는 인자 해시 (DataFrame은 내용 해시 = 데이터 지문)
+- 크기 제한: 함수별 FIGURE_CACHE_SIZE개, 가장 오래 안 쓴 것부터 제거 (LRU)
+- COVID_SHARED_CACHE_DIR가 있으면 프로세스 캐시 미스 때 레플리카 공유 디스크 캐시를 확인
+
+st.plotly_chart는 figure를 읽기만 하므로 캐시된 객체를 복사 없이 그대로 넘긴다.
+반환된 figure를 수정하면 다른 세션에도 영향을 주므로 수정하지 말 것.
+"""
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+from plotly.subplots import make_subplots
+
+import profiling
+import shared_cache
+
+FIGURE_CACHE_SIZE = 16
+
+_process_cache = profiling.cached(st.cache_resource(max_entries=FIGURE_CACHE_SIZE, show_spinner=False))
+
+
+def figure_cache(func):
+    # 프로세스 캐시(st.cache_resource) → 레플리카 공유 디스크 캐시(shared_cache.py, 선택) → 새로 생성
+    return _process_cache(shared_cache.figures(func))
+
+
+# ===========================================================================================================================
+# 전 세계 데이터
+# ===========================================================================================================================
+
+@figure_cache
+def cases_ratio_bar(top, title):
+    fig = px.bar(
+        top,
+        x="Country",
+        y="Cases per 100k",
+        hover_data=["Total Cases", "Population"],
+        labels={"Cases per 100k": "Cases per 100,000 people"},
+        title=title,
+    )
+    fig.update_layout(xaxis_tickangle=-45)
+    return fig
+
+
+@figure_cache
+def percent_ranking_bar(top, metric, hover_col, label, title):
+    # 치명률 / 회복률 막대그래프 (막대 위에 % 표시)
+    fig = px.bar(
+        top,
+        x="Country",
+        y=metric,
+        hover_data=["Total Cases", hover_col],
+        text=metric,
+        labels={metric: label},
+        title=title,
+    )
+    fig.update_traces(
+        texttemplate='%{text:.2f}%',
+        textposition='outside'
+    )
+    max_val = top[metric].max()
+    fig.update_layout(
+        yaxis_range=[0, max_val * 1.15],
+        xaxis_tickangle=-45
+    )
+    return fig
+
+
+@figure_cache
+def world_choropleth(df, feature_key=None, geo_version=None, _geojson=None):
+    # 나라 이름 대신 수집 시 붙여 둔 ISO-3 코드로 그림 (브라우저에서 이름을 다시 맞춰 볼 필요 없음)
+    # _geojson(나라 경계)이 있으면 그 파일로, 없으면 Plotly 내장 지도로 그림
+    df = df[df["ISO3"] != ""]
+    geometry = (
+        dict(geojson=_geojson, featureidkey=feature_key)
+        if _geojson is not None
+        else dict(locationmode="ISO-3")
+    )
+    fig = px.choropleth(
+        df,
+        locations="ISO3",
+        color="Total Cases",
+        hover_name="Country",
+        hover_data={"ISO3": False},
+        color_continuous_scale="Reds",
+        projection="natural earth",
+        labels={"Total Cases": "Total Cases"},
+        **geometry,
+    )
+    if _geojson is not None:
+        # 내장 지도(해안선 등)를 받지 않도록 기본 지형 레이어를 끔
+        fig.update_geos(visible=False)
+    fig.update_layout(
+        margin=dict(l=0, r=0, t=0, b=0),
+        coloraxis_colorbar=dict(title="Total Cases")
+    )
+    return fig
+
+
+# ===========================================================================================================================
+# 대한민국 데이터
+# ===========================================================================================================================
+
+@figure_cache
+def trend_line(df_smooth, title, x_label, y_label, date_format="%Y년 %m월"):
+    df_plotly = df_smooth.reset_index()
+
+    fig = px.line(
+        df_plotly,
+        x='일자',
+        y=['국내발생(명)', '해외유입(명)'],
+        title=title,
+        labels={'일자': x_label, 'value': y_label, 'variable': '구분'}
+    )
+    fig.update_yaxes(tickformat=",,.0f")
+    fig.update_traces(
+        hovertemplate="<b>%{x|" + date_format + "}</b><br>%{data.name}: %{y:,.0f} 명<extra></extra>",
+        connectgaps=True,  # 다운샘플링으로 비운 값(NaN)은 이어서 그림
+    )
+    return fig
+
+
+@figure_cache
+def region_dual_bar(df_sorted):
+    x_indices = np.arange(len(df_sorted))
+    x_labels = df_sorted['구분']
+
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+
+    fig.add_trace(
+        go.Bar(
+            x=x_indices - 0.2,
+            y=df_sorted['누적확진자(명)'] / 100000, # 10만 단위로 스케일링
+            name='누적 확진자 (10만 명)',
+            marker_color='royalblue',
+            width=0.4,
+            customdata=df_sorted[['구분', '누적확진자(명)']],
+            hovertemplate="<b>%{customdata[0]}</b><br>누적 확진자: %{customdata[1]:,d} 명<extra></extra>"
+        ),
+        secondary_y=False,
+    )
+
+    fig.add_trace(
+        go.Bar(
+            x=x_indices + 0.2,
+            y=df_sorted['누적사망자(명)'],
+            name='누적 사망자 (명)',
+            marker_color='crimson',
+            width=0.4,
+            customdata=df_sorted[['구분', '누적사망자(명)']],
+            hovertemplate="<b>%{customdata[0]}</b><br>누적 사망자: %{customdata[1]:,d} 명<extra></extra>"
+        ),
+        secondary_y=True,
+    )
+
+    # 레이아웃 및 축 설정
+    fig.update_layout(
+        title_text='시도별 누적 확진자 및 사망자',
+        xaxis=dict(
+            tickmode='array',
+            tickvals=x_indices,
+            ticktext=x_labels
+        ),
+        xaxis_tickangle=0,
+        legend_title_text='범례'
+    )
+
+    # Y축 제목 설정
+    fig.update_yaxes(title_text="누적 확진자 (10만 명)", secondary_y=False)
+    fig.update_yaxes(title_text="누적 사망자 (명)", secondary_y=True)
+    return fig
+
+
+@figure_cache
+def region_scatter_map(df_region, map_style="carto-positron", geo_version=None, _outline=None):
+    # _outline(경계 GeoJSON)은 해시하지 않고 geo_version으로 캐시 키를 구분
+    fig = px.scatter_mapbox(
+        df_region,
+        lat="lat",
+        lon="lon",
+        size="누적확진자(명)",
+        color="누적확진자(명)",
+        hover_name="구분",
+        hover_data={"누적확진자(명)": ":,"},
+        size_max=40,
+        zoom=5.8,
+        mapbox_style=map_style,
+        color_continuous_scale="Reds",
+    )
+    if _outline is not None:
+        fig.update_layout(mapbox_layers=[dict(source=_outline, type="line", color="gray", line=dict(width=0.8))])
+    fig.update_layout(
+        margin=dict(l=0, r=0, t=0, b=0),
+        coloraxis_colorbar=dict(title="누적 확진자(명)"),
+    )
+    return fig
+
+
+@figure_cache
+def region_choropleth_map(df_region, feature_key, map_style="carto-positron", geo_version=None, _geojson=None):
+    fig = px.choropleth_mapbox(
+        df_region,
+        geojson=_geojson,
+        locations="구분",
+        featureidkey=feature_key,
+        color="누적확진자(명)",
+        hover_name="구분",
+        hover_data={"구분": False, "누적확진자(명)": ":,", "누적사망자(명)": ":,"},
+        center=dict(lat=36.0, lon=127.8),
+        zoom=5.8,
+        mapbox_style=map_style,
+        color_continuous_scale="Reds",
+    )
+    fig.update_layout(
+        margin=dict(l=0, r=0, t=0, b=0),
+        coloraxis_colorbar=dict(title="누적 확진자(명)"),
+    )
+    return fig
+
+
+@figure_cache
+def age_bar(bands, values, title, y_label):
+    # 연령대별 막대그래프 (막대 위에 값 표시)
+    fig = px.bar(
+        x=bands,
+        y=values,
+        text=values,
+        title=title,
+        labels={"x": "연령대", "y": y_label},
+    )
+    fig.update_traces(
+        texttemplate="%{text:,}명",
+        textposition="outside",
+        hovertemplate="<b>%{x}</b><br>" + y_label + ": %{y:,} 명<extra></extra>",
+    )
+    fig.update_layout(
+        xaxis_tickangle=-45,
+        yaxis_range=[0, max(values) * 1.15],
+    )
+    return fig
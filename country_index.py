@@ -0,0 +1,74 @@
+"""
+국가 이름 인덱스
+
+데이터를 읽을 때 한 번만 만들어 두고 세계 지도 옆 상세 패널에서 사용한다.
+- names   : 정렬된 국가 목록 (selectbox 옵션)
+- position: 국가 이름 → 행 번호 (상세 지표 조회를 O(1)로)
+- search(): 앞부분 일치(정렬 목록 + 이분 탐색) 후, 부족하면 3-gram 역색인으로 오타 허용 검색
+"""
+import bisect
+import re
+from collections import Counter, defaultdict
+
+SEARCH_LIMIT = 50
+MIN_FUZZY_SCORE = 0.4
+
+
+def _normalize(name):
+    # 대소문자, 마침표·하이픈 등 구두점 차이 무시 ("S. Korea" → "s korea")
+    return re.sub(r"[\W_]+", " ", str(name).casefold()).strip()
+
+
+def _trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CountryIndex:
+    def __init__(self, names):
+        self.position = {}
+        for i, name in enumerate(names):
+            self.position.setdefault(name, i)
+        self.names = sorted(self.position)
+
+        # 검색용: (정규화된 이름, 원래 이름)을 정규화 이름 순으로
+        pairs = sorted((_normalize(name), name) for name in self.names)
+        self._keys = [key for key, _ in pairs]
+        self._labels = [name for _, name in pairs]
+
+        self._postings = defaultdict(list)
+        for i, key in enumerate(self._keys):
+            for gram in _trigrams(key):
+                self._postings[gram].append(i)
+
+    def __len__(self):
+        return len(self.names)
+
+    def row(self, name):
+        return self.position.get(name)
+
+    def prefix(self, query, limit=SEARCH_LIMIT):
+        key = _normalize(query)
+        start = bisect.bisect_left(self._keys, key)
+        end = bisect.bisect_right(self._keys, key + "\uffff", lo=start)
+        return self._labels[start:min(end, start + limit)]
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        found = self.prefix(query, limit)
+        key = _normalize(query)
+        if len(found) >= limit or len(key) < 3:
+            return found
+
+        # 3-gram이 많이 겹치는 이름 순으로 나머지를 채움
+        grams = _trigrams(key)
+        hits = Counter()
+        for gram in grams:
+            hits.update(self._postings.get(gram, ()))
+
+        seen = set(found)
+        for i, count in hits.most_common():
+            if count / len(grams) < MIN_FUZZY_SCORE or len(found) >= limit:
+                break
+            if self._labels[i] not in seen:
+                found.append(self._labels[i])
+        return found
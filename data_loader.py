@@ -0,0 +1,391 @@
+"""
+COVID-19 대시보드 데이터 로더
+
+covid_worldwide.csv, 누적.csv, 일별 국내 & 해외.csv, 연령별.csv 네 파일을 한 곳에서 읽고 정리한다.
+- read_* 함수: Streamlit과 무관한 순수 파싱/정리 함수 (벤치마크, 수집 스크립트에서도 사용)
+- load_* 함수: 대시보드에서 쓰는 캐시 로더. 캐시 키는 (파일 경로, 수정 시각)이라
+  CSV를 교체하면 다음 rerun에서 자동으로 다시 읽는다.
+
+캐시가 비어 있을 때는 ingest.py로 만든 스냅샷(snapshot.py)을 먼저 찾고,
+스냅샷이 없거나 원본 CSV보다 오래됐을 때만 CSV를 파싱한다.
+
+백그라운드 갱신(refresher.py)이 켜져 있으면 캐시 키의 수정 시각은 파일이 아니라
+갱신 스레드가 검증·캐시 준비를 마치고 공개(publish)한 값을 쓴다.
+
+COVID_SHARED_CACHE_DIR를 주면(shared_cache.py) 파싱한 프로세스가 스냅샷을 남기고, 같은 호스트의
+다른 레플리카는 그 스냅샷을 메모리 매핑해서 읽는다 (COVID_SNAPSHOT_DIR가 같은 폴더를 가리켜야 함).
+그 폴더 안의 일별 증분 저장소(timeseries.STORE_DIR)도 모든 레플리카가 함께 쓰며,
+갱신과 읽기는 저장소의 잠금 파일로 한 번에 한 프로세스씩만 한다.
+
+캐시된 프레임은 모든 세션이 같은 객체를 공유한다 (st.cache_resource, 세션마다 복사하지 않음).
+대신 pandas Copy-on-Write를 켜 두어, 화면 코드에서 잘라 쓴 프레임은 원본의 뷰로 동작하고
+어느 쪽을 수정하더라도 그때만 복사되므로 공유 프레임이 바뀌지 않는다.
+"""
+import codecs
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import geo
+import profiling
+import shared_cache
+import snapshot
+from country_index import CountryIndex
+from metrics import add_world_metrics
+
+# 공유 캐시 프레임을 뷰로 안전하게 쓰기 위한 Copy-on-Write (pandas 3에서는 기본값)
+pd.set_option("mode.copy_on_write", True)
+
+# COVID_DATA_DIR로 CSV 폴더를 바꿀 수 있음 (벤치마크의 합성 데이터, 배포 환경의 데이터 볼륨 등)
+DATA_DIR = os.environ.get("COVID_DATA_DIR", os.path.dirname(os.path.abspath(__file__)))
+
+WORLD_CSV = "covid_worldwide.csv"
+CUMULATIVE_CSV = "누적.csv"
+DAILY_CSV = "일별 국내 & 해외.csv"
+AGE_CSV = "연령별.csv"
+
+WORLD_NUM_COLS = [
+    "Total Cases",
+    "Total Deaths",
+    "Total Recovered",
+    "Active Cases",
+    "Total Test",
+    "Population",
+]
+CUMULATIVE_NUM_COLS = ["누적확진자(명)", "누적사망자(명)"]
+DAILY_NUM_COLS = ["국내발생(명)", "해외유입(명)"]
+AGE_NUM_COLS = ["누적확진자(명)", "누적사망자(명)"]
+NATION_NAME = "계"  # 누적.csv 첫 행의 전국 합계
+
+# 나라 이름·코드 컬럼 dtype (pyarrow는 streamlit 의존성이라 항상 설치돼 있음)
+COUNTRY_DTYPE = "string[pyarrow]"
+
+# read_* 함수의 출력 형태가 바뀌면 올린다 (이전 스냅샷을 무효화)
+SCHEMA_VERSION = 4
+
+
+def data_path(file_name):
+    return os.path.join(DATA_DIR, file_name)
+
+
+SNIFF_BYTES = 64 * 1024
+
+
+def sniff_encoding(raw, fallback="cp949"):
+    """파일 앞부분 바이트로 인코딩을 정한다. UTF-8(BOM 유무 무관)로 읽히면 utf-8-sig, 아니면 fallback."""
+    try:
+        # 앞부분만 잘라 읽었으므로 끝에 걸친 멀티바이트 글자는 오류로 보지 않음
+        codecs.getincrementaldecoder("utf-8")().decode(raw, final=False)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        return fallback
+
+
+def detect_encoding(path, fallback="cp949"):
+    with open(path, "rb") as f:
+        return sniff_encoding(f.read(SNIFF_BYTES), fallback)
+
+
+def _read_csv(path, fallback_encoding, **kwargs):
+    # 인코딩은 앞부분을 한 번 읽어서 정함 (실패 후 다시 읽지 않음)
+    return pd.read_csv(path, encoding=detect_encoding(path, fallback_encoding), **kwargs)
+
+
+def _compact_int(series):
+    # 값 범위에 맞춰 int32/int64로 줄이고, 결측이 남아 있으면 nullable 정수(Int32/Int64)로
+    if series.isna().all():
+        return series.astype("Int32")
+    lo, hi = series.min(), series.max()
+    wide = lo < np.iinfo(np.int32).min or hi > np.iinfo(np.int32).max
+    if series.hasnans:
+        return series.astype("Int64" if wide else "Int32")
+    return series.astype(np.int64 if wide else np.int32)
+
+
+def _smallest_int(series):
+    # 결측이 없는 정수 컬럼을 값 범위에 맞는 가장 작은 정수형(int8~int64)으로
+    return pd.to_numeric(series, downcast="integer")
+
+
+def _parse_count_strings(values, dash_as_zero):
+    # 문자열 배열을 (행, 글자 위치) 코드 행렬로 보고, 글자 위치마다 전체 행을 한 번에 처리
+    try:
+        raw = np.asarray(values, dtype="S")
+        codes = raw.view(np.uint8).reshape(len(raw), raw.itemsize)
+    except UnicodeEncodeError:
+        raw = np.asarray(values, dtype="U")
+        codes = raw.view(np.uint32).reshape(len(raw), raw.itemsize // 4)
+
+    n = len(raw)
+    result = np.zeros(n, dtype=np.int64)
+    digits = np.zeros(n, dtype=np.int16)
+    dash = np.zeros(n, dtype=bool)
+    valid = np.ones(n, dtype=bool)
+
+    for j in range(codes.shape[1]):
+        c = codes[:, j]
+        is_digit = (c >= 48) & (c <= 57)
+        np.multiply(result, 10, out=result, where=is_digit)
+        np.add(result, c.astype(np.int64) - 48, out=result, where=is_digit)
+        digits += is_digit
+        dash |= c == 45
+        # 허용 문자: 숫자, 쉼표, 공백, '-', 고정 길이 패딩(0)
+        valid &= is_digit | (c == 44) | (c == 32) | (c == 45) | (c == 0)
+
+    # int64 누적값은 19자리부터 넘칠 수 있으므로 18자리를 넘는 값은 잘못된 값(NaN)으로 봄
+    valid &= digits <= 18
+    out = result.astype(np.float64)
+    is_number = valid & (digits > 0) & ~dash
+    is_dash = valid & dash & (digits == 0)
+    out[~is_number] = np.nan
+    if dash_as_zero:
+        out[is_dash] = 0
+    return out
+
+
+def parse_counts(series, dash_as_zero=True):
+    """
+    "1,234" 처럼 쉼표가 들어간 건수 컬럼을 정수 컬럼으로 변환한다.
+    read_csv(thousands=",")로 이미 숫자가 된 컬럼은 결측만 처리하고,
+    문자열로 남은 컬럼은 벡터화된 파서로 한 번에 변환한다. '-'는 0으로 본다.
+    """
+    if series.dtype.kind in "iuf":
+        # read_csv의 na_values로 '-'가 이미 NaN이 된 경우
+        if dash_as_zero:
+            series = series.fillna(0)
+    else:
+        series = pd.Series(
+            _parse_count_strings(series.to_numpy(), dash_as_zero),
+            index=series.index,
+            name=series.name,
+        )
+    return _compact_int(series)
+
+
+# ===========================================================================================================================
+# 순수 파싱 함수
+# ===========================================================================================================================
+
+def read_worldwide(path) -> pd.DataFrame:
+    # 1) CSV 읽기 (N/A를 결측값으로 인식, 쓰지 않는 Serial Number 등은 읽지 않음)
+    wanted = {"Country", *WORLD_NUM_COLS}
+    df = pd.read_csv(path, na_values=["N/A"], thousands=",", usecols=lambda col: col.strip() in wanted)
+
+    # 2) 컬럼 이름 앞뒤 공백 제거 (예: "Country " → "Country")
+    df.columns = df.columns.str.strip()
+
+    # 3) 필요한 컬럼 확인
+    for col in ["Country"] + WORLD_NUM_COLS:
+        if col not in df.columns:
+            raise ValueError(f"CSV 파일에 '{col}' 컬럼이 없습니다. 현재 컬럼: " + ", ".join(df.columns))
+
+    df["Country"] = df["Country"].astype(str).str.strip()
+
+    # 4) N/A(결측) 포함된 행 삭제
+    df = df.dropna()
+
+    # 5) Country가 빈 문자열인 행 삭제
+    df = df[df["Country"] != ""]
+
+    # 6) 숫자형 컬럼 정수로 변환 (쉼표는 read_csv에서 이미 처리)
+    for col in WORLD_NUM_COLS:
+        df[col] = parse_counts(df[col], dash_as_zero=False)
+
+    # 숫자 변환 후 NaN 생긴 행 또 제거
+    df = df.dropna(subset=WORLD_NUM_COLS)
+    for col in WORLD_NUM_COLS:
+        df[col] = _smallest_int(df[col])
+
+    # 7) 지도용 ISO-3 코드 (별칭 표에 없는 이름은 빈 문자열, 지도에서 빠짐)
+    #    나라 이름은 모두 달라서 범주형보다 Arrow 문자열이 작음 (하나의 연속 버퍼 + 오프셋)
+    df["ISO3"] = geo.country_iso3(df["Country"]).astype(COUNTRY_DTYPE)
+    df["Country"] = df["Country"].astype(COUNTRY_DTYPE)
+
+    # 8) 파생 지표(10만 명당 확진자, 치명률 등)는 여기서 한 번만 계산
+    return add_world_metrics(df.reset_index(drop=True))
+
+
+def read_cumulative(path) -> pd.DataFrame:
+    df = _read_csv(path, "cp949", thousands=",", na_values={col: ["-"] for col in CUMULATIVE_NUM_COLS})
+    df.columns = df.columns.str.strip()
+    df = df.rename(columns={"시도명": "구분"})
+    for col in CUMULATIVE_NUM_COLS:
+        df[col] = parse_counts(df[col])
+
+    # 계층 표시: '계'는 전국, 시도명이 바뀌는 첫 행은 시도 합계, 나머지는 시군구
+    # (시군구 이름이 원본에 없어서 시도 안 순번을 붙임, 합계 행은 0)
+    name = df["구분"]
+    first = name.ne(name.shift())
+    df["level"] = np.where(name == NATION_NAME, "nation", np.where(first, "sido", "sigungu"))
+    df["시군구번호"] = first.groupby(first.cumsum()).cumcount()
+    return df
+
+
+DAILY_READ_OPTIONS = {"thousands": ",", "na_values": {col: ["-"] for col in DAILY_NUM_COLS}}
+
+
+def clean_daily(df) -> pd.DataFrame:
+    # 증분 수집(timeseries.py)에서도 새로 붙은 행만 이 함수로 정리한다
+    df.columns = df.columns.str.strip()
+    df["일자"] = pd.to_datetime(df["일자"])
+
+    for col in DAILY_NUM_COLS:
+        df[col] = parse_counts(df[col])
+
+    return df.set_index("일자")
+
+
+def read_daily(path) -> pd.DataFrame:
+    return clean_daily(_read_csv(path, "cp949", **DAILY_READ_OPTIONS))
+
+
+def read_age(path) -> pd.DataFrame:
+    # 일자 × 연령대별 누적 건수 (긴 형태, 날짜순). 표 계산은 ages.AgeTable에서
+    df = _read_csv(path, "cp949", thousands=",", na_values={col: ["-"] for col in AGE_NUM_COLS})
+    df.columns = df.columns.str.strip()
+    df["일자"] = pd.to_datetime(df["일자"])
+    df["연령대"] = df["연령대"].astype(str).str.strip()
+    for col in AGE_NUM_COLS:
+        df[col] = parse_counts(df[col])
+    return df.sort_values("일자", kind="stable").reset_index(drop=True)
+
+
+DATASETS = {
+    "worldwide": (WORLD_CSV, read_worldwide),
+    "cumulative": (CUMULATIVE_CSV, read_cumulative),
+    "daily": (DAILY_CSV, read_daily),
+    "age": (AGE_CSV, read_age),
+}
+
+
+# 데이터셋을 알아보는 헤더 컬럼 (추가로 넣는 지역별 CSV도 헤더로 데이터셋을 정함)
+# 위에서부터 확인 (연령별 파일은 누적 컬럼을 함께 가지므로 cumulative보다 먼저)
+DATASET_COLUMNS = {
+    "worldwide": {"Country", *WORLD_NUM_COLS},
+    "age": {"일자", "연령대", *AGE_NUM_COLS},
+    "cumulative": set(CUMULATIVE_NUM_COLS),
+    "daily": {"일자", *DAILY_NUM_COLS},
+}
+
+
+def classify_csv(path):
+    """CSV 헤더를 보고 데이터셋 이름을 돌려준다. 어느 데이터셋과도 맞지 않으면 None."""
+    with open(path, "rb") as f:
+        raw = f.read(SNIFF_BYTES)
+    header = raw.decode(sniff_encoding(raw), errors="replace").splitlines()[0] if raw else ""
+    columns = {col.strip() for col in header.split(",")}
+    for name, required in DATASET_COLUMNS.items():
+        if required <= columns:
+            return name
+    return None
+
+
+# 원본 CSV 말고도 정리 결과에 영향을 주는 파일. 수정 시각이 캐시 키와 스냅샷 manifest에 들어감
+DATASET_DEPS = {
+    "worldwide": [geo.geo_path(geo.COUNTRY_ISO3)],
+}
+
+
+def dataset_deps(name):
+    return DATASET_DEPS.get(name, [])
+
+
+def snapshot_name(name, path):
+    # 데이터 폴더의 기본 파일만 데이터셋 이름. 추가 파일은 "데이터셋.파일이름-경로해시"
+    # (하위 폴더마다 같은 파일 이름이 있어도, 기본 파일과 이름이 같아도 겹치지 않음)
+    path = os.path.abspath(path)
+    if path == os.path.abspath(data_path(DATASETS[name][0])):
+        return name
+    digest = hashlib.sha1(path.encode("utf-8")).hexdigest()[:10]
+    return f"{name}.{os.path.splitext(os.path.basename(path))[0]}-{digest}"
+
+
+def read_dataset(name, path=None) -> pd.DataFrame:
+    # 최신 스냅샷이 있으면 메모리 매핑해서 읽고, 없으면 CSV 파싱
+    file_name, reader = DATASETS[name]
+    path = path or data_path(file_name)
+    snap = snapshot_name(name, path)
+    deps = dataset_deps(name)
+    df = snapshot.read_snapshot(snap, path, SCHEMA_VERSION, deps=deps)
+    if df is not None:
+        return df
+
+    df = reader(path)
+    if shared_cache.ENABLED:
+        # 레플리카 공유 모드: 스냅샷을 남겨 다른 프로세스는 파싱하지 않게 하고,
+        # 이 프로세스도 매핑된 스냅샷을 써서 숫자 컬럼 메모리를 공유
+        try:
+            snapshot.write_snapshot(snap, df, path, SCHEMA_VERSION, deps=deps)
+        except OSError:
+            return df
+        shared = snapshot.read_snapshot(snap, path, SCHEMA_VERSION, deps=deps)
+        if shared is not None:
+            return shared
+    return df
+
+
+# ===========================================================================================================================
+# 캐시 로더 (키: 경로 + 수정 시각)
+# ===========================================================================================================================
+
+# 백그라운드 갱신이 공개한 버전 (경로 → 수정 시각). 값 하나를 바꿔 끼우므로 세션 사이에 원자적
+_published_mtimes = {}
+
+
+def publish(path, mtime):
+    _published_mtimes[path] = mtime
+
+
+def source_mtime(path):
+    published = _published_mtimes.get(path)
+    if published is not None:
+        return published
+    try:
+        return os.path.getmtime(path)
+    except FileNotFoundError:
+        st.error(f"'{os.path.basename(path)}' 파일을 찾을 수 없습니다.")
+        st.stop()
+
+
+@profiling.cached(st.cache_resource(show_spinner=False, max_entries=len(DATASETS) * 2), name="load_dataset")
+def _cached_frame(name, path, mtime, deps_mtimes):
+    return read_dataset(name, path)
+
+
+def load_dataset(name, path, mtime):
+    """
+    캐시된 데이터셋 표. 다른 모듈의 캐시 함수는 자기 캐시 키에 쓴 (path, mtime)을 그대로 넘겨
+    같은 버전의 파일을 읽는다. 별칭 표 등 의존 파일을 고쳐도 CSV와 마찬가지로 다음 rerun에서 다시 읽음.
+    """
+    return _cached_frame(name, path, mtime, tuple(geo._mtime(dep) for dep in dataset_deps(name)))
+
+
+def load_data():
+    path = data_path(WORLD_CSV)
+    try:
+        return load_dataset("worldwide", path, source_mtime(path))
+    except ValueError as e:
+        st.error(str(e))
+        st.stop()
+
+
+@profiling.cached(st.cache_resource(show_spinner=False, max_entries=2))
+def _cached_country_index(path, mtime):
+    return CountryIndex(load_dataset("worldwide", path, mtime)["Country"].tolist())
+
+
+def load_data_with_index():
+    """
+    세계 데이터와 그 국가 인덱스. 한 번 읽은 수정 시각으로 둘 다 가져오므로 인덱스의 행 번호가
+    돌려준 프레임과 항상 일치한다 (fragment rerun 사이에 CSV가 바뀌어도 어긋나지 않음).
+    """
+    path = data_path(WORLD_CSV)
+    mtime = source_mtime(path)
+    try:
+        return load_dataset("worldwide", path, mtime), _cached_country_index(path, mtime)
+    except ValueError as e:
+        st.error(str(e))
+        st.stop()
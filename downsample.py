@@ -0,0 +1,78 @@
+"""
+긴 시계열 그래프용 서버 측 다운샘플링
+
+브라우저로 보내는 점 개수를 차트 가로 픽셀 수 정도(TARGET_POINTS)로 줄여서,
+기간이 길어져도 payload 크기와 렌더링 시간이 일정하게 유지되도록 한다.
+- lttb  : Largest-Triangle-Three-Buckets. 모양(특히 봉우리)을 잘 유지
+- minmax: 구간마다 최솟값·최댓값만 남김. 완전히 벡터화되어 가장 빠름
+
+컬럼마다 고른 행이 다르므로, 여러 컬럼을 함께 줄일 때는 행 번호의 합집합을 남기고
+해당 컬럼에서 고르지 않은 값은 NaN으로 둔다 (그래프에서는 connectgaps로 이어서 그림).
+"""
+import numpy as np
+
+TARGET_POINTS = 1000
+METHODS = {"LTTB": "lttb", "Min-Max": "minmax"}
+
+
+def lttb(x, y, n_out):
+    """x, y에서 n_out개 점의 위치(정렬된 행 번호)를 고른다."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # 첫 점과 마지막 점은 고정, 나머지를 n_out - 2개 구간으로 나눔
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    picked = np.empty(n_out, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        # 이전에 고른 점, 다음 구간 평균점과 만드는 삼각형 넓이가 가장 큰 점
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(area.argmax())
+        picked[i + 1] = a
+    return picked
+
+
+def minmax(y, n_out):
+    """구간마다 최솟값과 최댓값 위치를 남긴다 (최대 n_out개 + 양 끝점)."""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    size = -(-n // (n_out // 2))
+    buckets = -(-n // size)
+    pad = buckets * size - n
+
+    lows = np.concatenate([y, np.full(pad, np.inf)]).reshape(buckets, size).argmin(axis=1)
+    highs = np.concatenate([y, np.full(pad, -np.inf)]).reshape(buckets, size).argmax(axis=1)
+    offsets = np.arange(buckets) * size
+    return np.unique(np.concatenate([[0, n - 1], offsets + lows, offsets + highs]))
+
+
+def downsample_frame(df, n_out=TARGET_POINTS, method="lttb"):
+    """DatetimeIndex를 가진 프레임을 컬럼별로 줄인다. 줄일 필요가 없으면 그대로 반환."""
+    if len(df) <= n_out:
+        return df
+
+    x = df.index.asi8
+    picks = {}
+    for col in df.columns:
+        y = df[col].to_numpy(dtype=np.float64)
+        picks[col] = lttb(x, y, n_out) if method == "lttb" else minmax(y, n_out)
+
+    keep = np.unique(np.concatenate(list(picks.values())))
+    out = df.iloc[keep].astype(np.float64)
+    for col, rows in picks.items():
+        mask = np.isin(keep, rows, assume_unique=True)
+        out.loc[~mask, col] = np.nan
+    return out
@@ -0,0 +1,158 @@
+"""
+지도용 정적 지리 데이터 (geodata/ 폴더)
+
+- korea_regions.csv  : 시도·시군구 중심 좌표 표. 파일 수정 시각이 버전이 되어 지역 계층과
+                       지도 figure 캐시 키에 들어가므로, 좌표를 고치면 자동으로 다시 join한다
+- korea_sido.geojson : (선택) 시도 경계. feature의 properties.name이 누적.csv의 구분(서울, 부산 …)과
+                       같아야 한다. 있으면 경계(choropleth) 지도 모드와 오프라인 외곽선에 쓴다.
+- country_iso3.csv   : covid_worldwide.csv의 나라 이름(별칭 포함) → ISO-3 코드. 데이터를 읽을 때 ISO3 컬럼을 붙인다.
+                       수정 시각이 세계 데이터의 캐시 키와 스냅샷 manifest에 들어가므로 고치면 자동으로 다시 만든다
+- world_countries.geojson : (선택) 나라 경계 (예: Natural Earth admin 0, 퍼블릭 도메인).
+                       properties.ISO_A3에 ISO-3 코드가 있어야 한다. 있으면 세계 지도를 이 파일로 그린다.
+
+좌표 표와 별칭 표는 파일 버전(경로 + 수정 시각)마다 한 번만 읽는다.
+COVID_OFFLINE_MAPS=1 이면 지도 배경 타일을 받지 않는 스타일(white-bg)로 그린다 (인터넷이 없는 배포 환경용).
+경계 GeoJSON은 저장소에 들어 있지 않으므로, 오프라인에서 지도를 제대로 보려면 두 GeoJSON을 geodata/에 넣어야 한다
+(없으면 대시보드가 지도 아래에 경고를 띄운다).
+"""
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import profiling
+
+GEO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "geodata")
+KOREA_COORDS = "korea_regions.csv"
+KOREA_GEOJSON = "korea_sido.geojson"
+KOREA_FEATURE_KEY = "properties.name"
+COUNTRY_ISO3 = "country_iso3.csv"
+WORLD_GEOJSON = "world_countries.geojson"
+WORLD_FEATURE_KEY = "properties.ISO_A3"
+
+OFFLINE = os.environ.get("COVID_OFFLINE_MAPS", "") == "1"
+ONLINE_STYLE = "carto-positron"
+OFFLINE_STYLE = "white-bg"  # 타일 요청 없이 배경만 그리는 mapbox 스타일
+
+# 경계 좌표를 반올림할 소수점 자리 (3자리 ≈ 100m, 대시보드 축척에서는 차이가 보이지 않음)
+# 세계 지도처럼 넓은 지도는 1~2자리로 낮추면 payload가 크게 줄어든다
+GEOJSON_PRECISION = int(os.environ.get("COVID_GEOJSON_PRECISION", 3))
+
+RegionCoords = namedtuple("RegionCoords", ["version", "sido", "sigungu"])
+GeoLayer = namedtuple("GeoLayer", ["version", "geojson"])
+
+
+def geo_path(file_name):
+    return os.path.join(GEO_DIR, file_name)
+
+
+def map_style():
+    return OFFLINE_STYLE if OFFLINE else ONLINE_STYLE
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+# ===========================================================================================================================
+# 중심 좌표 표
+# ===========================================================================================================================
+
+def read_region_coords(path) -> RegionCoords:
+    df = pd.read_csv(path, comment="#", dtype={"level": "category", "구분": str, "시군구번호": "int64"})
+    sido = df.loc[df["level"] == "sido"].set_index("구분")[["lat", "lon"]]
+    sigungu = df.loc[df["level"] == "sigungu"].set_index(["구분", "시군구번호"])[["lat", "lon"]].sort_index()
+    return RegionCoords(f"{os.path.basename(path)}@{_mtime(path)}", sido, sigungu)
+
+
+@profiling.cached(st.cache_resource(show_spinner=False, max_entries=2))
+def _cached_region_coords(path, mtime):
+    return read_region_coords(path)
+
+
+def load_region_coords() -> RegionCoords:
+    path = geo_path(KOREA_COORDS)
+    return _cached_region_coords(path, _mtime(path))
+
+
+# ===========================================================================================================================
+# 나라 이름 → ISO-3
+# ===========================================================================================================================
+
+def read_country_aliases(path=None):
+    path = path or geo_path(COUNTRY_ISO3)
+    df = pd.read_csv(path, comment="#", dtype=str, keep_default_na=False)
+    return pd.Series(df["iso3"].to_numpy(), index=df["name"].str.strip())
+
+
+@profiling.cached(st.cache_resource(show_spinner=False, max_entries=2))
+def _cached_country_aliases(path, mtime):
+    return read_country_aliases(path)
+
+
+def load_country_aliases():
+    path = geo_path(COUNTRY_ISO3)
+    return _cached_country_aliases(path, _mtime(path))
+
+
+def country_iso3(countries, aliases=None):
+    """나라 이름 Series를 ISO-3 코드로 바꾼다 (별칭 표에 없으면 빈 문자열, 스냅샷에 그대로 저장 가능)."""
+    aliases = load_country_aliases() if aliases is None else aliases
+    return countries.map(aliases).fillna("")
+
+
+def unmatched_countries(df):
+    return df.loc[df["ISO3"] == "", "Country"].tolist()
+
+
+# ===========================================================================================================================
+# 경계 GeoJSON
+# ===========================================================================================================================
+
+def _simplify_ring(ring, precision):
+    # 좌표를 반올림하고 반올림 후 겹치는 연속 점을 제거 (닫힌 고리는 최소 4점 유지)
+    points = np.round(np.asarray(ring, dtype=np.float64), precision)
+    keep = np.concatenate([[True], np.any(np.diff(points, axis=0) != 0, axis=1)])
+    keep[-1] = True
+    return (points[keep] if keep.sum() >= 4 else points).tolist()
+
+
+def simplify_geojson(geojson, precision=GEOJSON_PRECISION):
+    """Polygon/MultiPolygon 좌표를 줄인 새 FeatureCollection을 돌려준다 (payload 크기 축소)."""
+    features = []
+    for feature in geojson["features"]:
+        geometry = feature["geometry"]
+        if geometry["type"] == "Polygon":
+            coords = [_simplify_ring(ring, precision) for ring in geometry["coordinates"]]
+        elif geometry["type"] == "MultiPolygon":
+            coords = [[_simplify_ring(ring, precision) for ring in polygon] for polygon in geometry["coordinates"]]
+        else:
+            coords = geometry["coordinates"]
+        features.append({**feature, "geometry": {"type": geometry["type"], "coordinates": coords}})
+    return {"type": "FeatureCollection", "features": features}
+
+
+def read_geojson(path, precision=GEOJSON_PRECISION):
+    with open(path, encoding="utf-8") as f:
+        geojson = json.load(f)
+    return geojson if precision is None else simplify_geojson(geojson, precision)
+
+
+@profiling.cached(st.cache_resource(show_spinner=False, max_entries=4))
+def _cached_geojson(path, mtime, precision):
+    return GeoLayer(f"{os.path.basename(path)}@{mtime}/{precision}", read_geojson(path, precision))
+
+
+def load_geojson(file_name, precision=GEOJSON_PRECISION):
+    """geodata/의 GeoJSON을 읽는다. 파일이 없으면 None (경계 지도 없이 동작)."""
+    path = geo_path(file_name)
+    mtime = _mtime(path)
+    if mtime is None:
+        return None
+    return _cached_geojson(path, mtime, precision)
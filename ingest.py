@@ -0,0 +1,96 @@
+"""
+CSV → 스냅샷 변환 스크립트
+
+각 CSV를 한 번 파싱·정리해서 .snapshot/ 아래에 메모리 매핑 가능한 스냅샷으로 저장한다.
+대시보드 로더(data_loader.py)는 스냅샷이 최신이면 CSV 대신 스냅샷을 읽는다.
+
+파일마다 프로세스 풀의 워커 하나가 읽기·정리·스냅샷 저장까지 맡으므로, 파일이 많으면
+코어 수만큼 동시에 처리된다 (정리된 프레임은 부모 프로세스로 보내지 않음).
+--dir로 지역별·국가별 CSV 폴더를 주면 헤더를 보고 데이터셋을 정해 함께 수집한다
+(스냅샷 이름은 "데이터셋.파일이름-경로해시", data_loader.read_dataset(데이터셋, 경로)로 읽음).
+경로 해시는 절대 경로로 만들므로 폴더를 옮기면 다시 수집해야 한다.
+
+    python ingest.py                       # 모든 데이터셋
+    python ingest.py daily worldwide       # 일부만
+    python ingest.py --dir regions/ -j 8   # 추가 폴더의 CSV까지, 워커 8개
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import geo
+import snapshot
+from data_loader import DATASETS, SCHEMA_VERSION, classify_csv, data_path, dataset_deps, snapshot_name
+
+
+def ingest_file(name, path):
+    """파일 하나를 정리해서 스냅샷으로 저장한다. 워커 프로세스에서 실행된다."""
+    start = time.perf_counter()
+    df = DATASETS[name][1](path)
+    target = snapshot.write_snapshot(snapshot_name(name, path), df, path, SCHEMA_VERSION, deps=dataset_deps(name))
+    elapsed = time.perf_counter() - start
+
+    # 지도에 나오지 않는 나라 이름은 수집할 때 한 번만 알려 줌 (geodata/country_iso3.csv에 별칭 추가)
+    unmatched = geo.unmatched_countries(df) if "ISO3" in df.columns else []
+    return name, path, len(df), elapsed, target, unmatched
+
+
+def find_extra_files(dirs):
+    """폴더 안의 CSV를 헤더로 분류한다. (데이터셋, 경로) 목록과 분류하지 못한 경로 목록."""
+    found, skipped = [], []
+    defaults = {os.path.abspath(data_path(file_name)) for file_name, _ in DATASETS.values()}
+    for folder in dirs:
+        for path in sorted(glob.glob(os.path.join(folder, "**", "*.csv"), recursive=True)):
+            if os.path.abspath(path) in defaults:
+                continue
+            name = classify_csv(path)
+            if name is None:
+                skipped.append(path)
+            else:
+                found.append((name, path))
+    return found, skipped
+
+
+def ingest(names=None, extra=(), jobs=None):
+    tasks = [(name, data_path(DATASETS[name][0])) for name in names or DATASETS]
+    tasks += list(extra)
+    jobs = min(jobs or os.cpu_count() or 1, len(tasks))
+
+    if jobs <= 1:
+        # 파일이 하나뿐이면 워커 프로세스를 띄우는 비용이 더 큼
+        return [ingest_file(name, path) for name, path in tasks]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(ingest_file, *zip(*tasks)))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", help="수집할 데이터셋 (기본: 모두)")
+    parser.add_argument("--dir", action="append", default=[], help="추가 CSV 폴더 (여러 번 지정 가능)")
+    parser.add_argument("-j", "--jobs", type=int, help="워커 프로세스 수 (기본: CPU 코어 수)")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.names if name not in DATASETS]
+    if unknown:
+        print("알 수 없는 데이터셋: " + ", ".join(unknown) + " (가능: " + ", ".join(DATASETS) + ")")
+        return 1
+
+    extra, skipped = find_extra_files(args.dir)
+    for path in skipped:
+        print(f"건너뜀 (헤더로 데이터셋을 알 수 없음): {path}")
+
+    start = time.perf_counter()
+    results = ingest(args.names or None, extra, args.jobs)
+    for name, path, rows, elapsed, target, unmatched in results:
+        print(f"{name:<12} {rows:>8,}행  {elapsed * 1000:8.1f} ms  → {target}")
+        if unmatched:
+            print(f"[{name}] ISO-3 코드를 찾지 못한 이름 {len(unmatched)}개: " + ", ".join(unmatched))
+    print(f"파일 {len(results)}개, 전체 {(time.perf_counter() - start) * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
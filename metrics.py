@@ -0,0 +1,43 @@
+"""
+전 세계 데이터 파생 지표와 순위 계산
+
+파생 지표는 데이터를 읽을 때 한 번만 계산해서 같은 프레임에 컬럼으로 붙여 두고,
+순위 차트는 전체 정렬·복사 없이 nlargest/nsmallest(부분 선택, O(n))로 상위 N개만 뽑는다.
+"""
+import numpy as np
+
+CASES_PER_100K = "Cases per 100k"
+CFR = "CFR (%)"
+RECOVERED = "Recovered (%)"
+TESTS_PER_CAPITA = "Tests per capita"
+ACTIVE_SHARE = "Active share (%)"
+
+METRIC_COLS = [CASES_PER_100K, CFR, RECOVERED, TESTS_PER_CAPITA, ACTIVE_SHARE]
+
+
+def _ratio(numerator, denominator, scale=1.0):
+    # 0으로 나눈 값(inf)은 순위에서 빠지도록 NaN으로
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = numerator.to_numpy(dtype=np.float64) / denominator.to_numpy(dtype=np.float64) * scale
+    values[~np.isfinite(values)] = np.nan
+    return values
+
+
+def add_world_metrics(df):
+    cases = df["Total Cases"]
+    df[CASES_PER_100K] = _ratio(cases, df["Population"], 100000)
+    df[CFR] = _ratio(df["Total Deaths"], cases, 100)
+    df[RECOVERED] = _ratio(df["Total Recovered"], cases, 100)
+    df[TESTS_PER_CAPITA] = _ratio(df["Total Test"], df["Population"])
+    df[ACTIVE_SHARE] = _ratio(df["Active Cases"], cases, 100)
+    return df
+
+
+def top_n(df, metric, n=20, min_cases=1000, ascending=False):
+    """
+    Total Cases >= min_cases 인 국가 중 metric 기준 상위(ascending=True면 하위) n개 행.
+    조건에 맞지 않는 행은 NaN으로 가려서 부분 선택하므로 프레임을 복사하지 않는다.
+    """
+    values = df[metric].where(df["Total Cases"] >= min_cases)
+    picked = values.nsmallest(n) if ascending else values.nlargest(n)
+    return df.loc[picked.index]
@@ -0,0 +1,153 @@
+"""
+미리 만들어 둔 차트(build.py 결과)를 대시보드에서 바로 쓰는 모드
+
+CSV는 길어야 하루에 한 번 바뀌는데 방문자마다 같은 차트를 다시 만들 필요가 없으므로,
+build.py가 기본 설정 화면의 모든 차트를 Plotly JSON과 정적 HTML로 만들어 둔다.
+
+    build/manifest.json        원본 파일 지문, 코드 지문, 차트 목록
+    build/<차트>-<설정 해시>.json  차트 하나 (plotly.io.to_json)
+    build/index.html            정적 대시보드 (plotly.min.js와 함께 어느 웹 서버로든 제공 가능)
+
+COVID_PRECOMPUTED_DIR=build 로 대시보드를 띄우면 화면 코드의 figure()가
+(차트 이름, 설정 값)이 같은 결과물을 찾아 파일에서 불러온다. 설정을 바꾼 화면이나
+원본 CSV·지도 데이터·대시보드 코드(*.py)가 빌드 이후 바뀐 경우에는 지금처럼 새로 만든다
+(원본 지문은 STAMP_TTL초마다 한 번만 확인). 차트에 넣을 데이터 준비(자르기·다운샘플링 등)는
+figure()에 넘기는 build 함수 안에 두어야 미리 만든 차트를 쓸 때 건너뛴다.
+"""
+import hashlib
+import json
+import os
+
+import plotly.io as pio
+import streamlit as st
+
+import data_loader
+import geo
+import profiling
+
+BUILD_DIR = os.environ.get("COVID_PRECOMPUTED_DIR")
+MANIFEST = "manifest.json"
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# build.py가 기록 중일 때: {"dir": 출력 폴더, "views": {파일: 정보}}
+_recording = None
+
+
+def view_file(name, params):
+    digest = hashlib.sha1(json.dumps([name, params], ensure_ascii=False, default=str).encode()).hexdigest()
+    return f"{name}-{digest[:16]}.json"
+
+
+def code_digest():
+    """
+    대시보드 코드(앱 폴더의 *.py) 내용 해시. 차트 입력을 만드는 코드(metrics, timeseries, 화면 제목 등)가
+    바뀌면 달라진다. 배포로 수정 시각만 바뀐 경우는 같게 보도록 내용으로 계산한다.
+    """
+    h = hashlib.sha1()
+    for name in sorted(os.listdir(APP_DIR)):
+        if name.endswith(".py"):
+            h.update(name.encode("utf-8"))
+            with open(os.path.join(APP_DIR, name), "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()
+
+
+def source_stamps():
+    """차트 결과에 영향을 주는 파일(데이터 CSV, geodata)의 크기·수정 시각과 코드 해시."""
+    paths = [data_loader.data_path(file_name) for file_name, _ in data_loader.DATASETS.values()]
+    if os.path.isdir(geo.GEO_DIR):
+        paths += [os.path.join(geo.GEO_DIR, name) for name in sorted(os.listdir(geo.GEO_DIR))]
+
+    stamps = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        stamps[os.path.basename(path)] = [stat.st_size, stat.st_mtime_ns]
+    stamps["code"] = code_digest()
+    return stamps
+
+
+# ===========================================================================================================================
+# 기록 (build.py)
+# ===========================================================================================================================
+
+def start_recording(output_dir):
+    global _recording
+    os.makedirs(output_dir, exist_ok=True)
+    _recording = {"dir": output_dir, "views": {}}
+
+
+def stop_recording():
+    global _recording
+    recording, _recording = _recording, None
+    return recording["views"] if recording else {}
+
+
+def recording():
+    return _recording is not None
+
+
+# ===========================================================================================================================
+# 제공
+# ===========================================================================================================================
+
+# 원본 파일 지문은 이 시간(초) 동안 재사용. 한 rerun의 여러 차트가 파일마다 stat하지 않도록
+STAMP_TTL = 2
+
+
+@profiling.cached(st.cache_data(show_spinner=False, ttl=STAMP_TTL))
+def _recent_source_stamps():
+    return source_stamps()
+
+
+@profiling.cached(st.cache_resource(show_spinner=False, max_entries=2))
+def _cached_manifest(path, mtime):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _manifest():
+    # 빌드가 없거나 빌드 이후 원본이 바뀌었으면 None (새로 만들어야 함)
+    if not BUILD_DIR:
+        return None
+    path = os.path.join(BUILD_DIR, MANIFEST)
+    try:
+        manifest = _cached_manifest(path, os.path.getmtime(path))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if manifest.get("schema") != data_loader.SCHEMA_VERSION or manifest.get("sources") != _recent_source_stamps():
+        return None
+    return manifest
+
+
+@profiling.cached(st.cache_resource(show_spinner=False, max_entries=64))
+def _cached_figure(path, built):
+    with open(path, encoding="utf-8") as f:
+        return pio.from_json(f.read())
+
+
+def figure(name, params, build):
+    """
+    (name, params) 화면의 차트. 최신 빌드에 같은 화면이 있으면 파일에서 불러오고,
+    없으면 build()로 새로 만든다. params는 그 화면의 위젯 값 (JSON으로 바꿀 수 있는 값).
+    """
+    if _recording is not None:
+        fig = build()
+        file_name = view_file(name, params)
+        with open(os.path.join(_recording["dir"], file_name), "w", encoding="utf-8") as f:
+            f.write(fig.to_json())
+        _recording["views"][file_name] = {
+            "name": name,
+            "params": json.loads(json.dumps(params, ensure_ascii=False, default=str)),
+            "title": fig.layout.title.text or name,
+        }
+        return fig
+
+    manifest = _manifest()
+    if manifest is not None:
+        file_name = view_file(name, params)
+        if file_name in manifest["views"]:
+            return _cached_figure(os.path.join(BUILD_DIR, file_name), manifest["built"])
+    return build()
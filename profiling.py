@@ -0,0 +1,235 @@
+"""
+rerun 단위 프로파일링 (선택 사항)
+
+켜는 방법
+- 모든 세션: 환경 변수 COVID_PROFILE=1
+- 한 세션만: 주소 뒤에 ?profile=1 (사이드바에 보이지 않는 숨은 스위치)
+
+켜져 있으면 rerun마다
+- section()으로 감싼 화면 구역별 시간
+- cached()로 감싼 캐시 함수별 시간과 히트/미스 (함수 본문이 실행됐으면 미스)
+를 모아서, rerun이 끝날 때 JSON 한 줄로 로그에 남기고(logger "covid_dashboard.profile",
+COVID_PROFILE_LOG=경로 를 주면 파일에도 기록) 사이드바에 구역별 막대 그래프를 보여 준다.
+
+st.fragment 대신 fragment()로 감싼 구역은 그 구역만 다시 실행될 때(fragment rerun)도
+따로 기록을 시작·종료한다 ("event": "fragment"). fragment는 사이드바에 쓸 수 없으므로
+이때의 그래프는 구역 아래에 보여 준다.
+
+st.stop()이나 예외로 end()까지 가지 못한 rerun은 그 세션의 다음 rerun이 시작될 때
+마지막으로 잰 시점까지의 기록을 "stopped": true 로 남긴다 (그래프는 없음).
+
+꺼져 있으면 section()은 공유된 빈 컨텍스트를 돌려주고 cached()는 캐시 함수를 바로 호출하므로
+추가 비용은 속성 조회 한 번 정도다.
+"""
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+ENV_ENABLED = os.environ.get("COVID_PROFILE", "") == "1"
+LOG_PATH = os.environ.get("COVID_PROFILE_LOG")
+
+logger = logging.getLogger("covid_dashboard.profile")
+
+# 스크립트는 세션마다 별도 스레드에서 실행되므로 진행 중인 rerun 기록은 스레드별로 둔다
+_local = threading.local()
+_NOOP = contextlib.nullcontext()
+
+# 세션별로 아직 end()하지 않은 기록. rerun마다 스크립트 스레드가 바뀔 수 있어 스레드 로컬과 따로 둔다
+_unfinished = {}
+
+
+def _configure_logger():
+    if logger.handlers:
+        return
+    handlers = [logging.StreamHandler()]
+    if LOG_PATH:
+        handlers.append(logging.FileHandler(LOG_PATH, encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def _current():
+    return getattr(_local, "run", None)
+
+
+# ===========================================================================================================================
+# rerun 시작 / 끝
+# ===========================================================================================================================
+
+def begin():
+    """스크립트 맨 위에서 호출. 프로파일링이 켜져 있으면 이번 rerun 기록을 시작한다."""
+    enabled = ENV_ENABLED or st.query_params.get("profile") == "1"
+    if not enabled:
+        _local.run = None
+        return
+
+    if "profile_session" not in st.session_state:
+        st.session_state.profile_session = uuid.uuid4().hex[:8]
+    session = st.session_state.profile_session
+
+    stopped = _unfinished.pop(session, None)
+    if stopped is not None:
+        _log(_record(stopped, stopped["last"]) | {"stopped": True})
+
+    start = time.perf_counter()
+    _local.run = _unfinished[session] = {
+        "session": session,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "start": start,
+        "last": start,
+        "sections": [],
+        "cache": [],
+        "misses": set(),
+    }
+
+
+def end(fragment=None):
+    """스크립트 맨 끝에서 호출. JSON 로그를 남기고 사이드바에 구역별 시간을 보여 준다."""
+    run = _current()
+    if run is None:
+        return
+    _local.run = None
+    if _unfinished.get(run["session"]) is run:
+        del _unfinished[run["session"]]
+
+    record = _record(run, time.perf_counter())
+    if fragment is not None:
+        record["event"] = "fragment"
+        record["fragment"] = fragment
+    _log(record)
+    _show_panel(record, st if fragment is not None else st.sidebar)
+
+
+def _record(run, stop):
+    return {
+        "event": "rerun",
+        "time": run["time"],
+        "session": run["session"],
+        "total_ms": round((stop - run["start"]) * 1000, 2),
+        "sections": run["sections"],
+        "cache": run["cache"],
+    }
+
+
+def _log(record):
+    _configure_logger()
+    logger.info(json.dumps(record, ensure_ascii=False))
+
+
+def _show_panel(record, container):
+    with container.expander(f"⏱ 프로파일 · {record['total_ms']:,.0f} ms", expanded=False):
+        if record["sections"]:
+            sections = pd.DataFrame(record["sections"]).groupby("name", sort=False)["ms"].sum()
+            st.bar_chart(sections, horizontal=True, x_label="ms", y_label="")
+        if record["cache"]:
+            cache = pd.DataFrame(record["cache"])
+            summary = cache.groupby("name", sort=False).agg(
+                calls=("ms", "size"), hits=("hit", "sum"), ms=("ms", "sum")
+            )
+            st.dataframe(summary, use_container_width=True)
+
+
+def _fragment_rerun():
+    # 전체 스크립트가 아니라 fragment만 다시 실행 중인지
+    ctx = get_script_run_ctx()
+    return ctx is not None and bool(ctx.fragment_ids_this_run)
+
+
+def fragment(func):
+    """
+    st.fragment 대신 쓰는 데코레이터. 전체 rerun 중에는 그 rerun 기록에 들어가고,
+    구역만 다시 실행될 때는 그 실행을 따로 기록한다.
+    """
+    @functools.wraps(func)
+    def body(*args, **kwargs):
+        run = _current()
+        # fragment 안의 fragment는 바깥 fragment의 기록에 들어감
+        if not _fragment_rerun() or (run is not None and run.get("fragment")):
+            return func(*args, **kwargs)
+        begin()
+        if _current() is not None:
+            _current()["fragment"] = True
+        try:
+            return func(*args, **kwargs)
+        finally:
+            end(fragment=func.__name__)
+
+    return st.fragment(body)
+
+
+# ===========================================================================================================================
+# 계측
+# ===========================================================================================================================
+
+@contextlib.contextmanager
+def _timed_section(run, name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        run["last"] = time.perf_counter()
+        run["sections"].append({"name": name, "ms": round((run["last"] - start) * 1000, 2)})
+
+
+def section(name):
+    """화면 구역을 감싸는 컨텍스트. 꺼져 있으면 아무 일도 하지 않는다."""
+    run = _current()
+    return _NOOP if run is None else _timed_section(run, name)
+
+
+def cached(cache_decorator, name=None):
+    """
+    st.cache_data / st.cache_resource 데코레이터를 감싸 히트/미스와 호출 시간을 기록한다.
+
+        @profiling.cached(st.cache_resource(show_spinner=False))
+        def _cached_x(path, mtime): ...
+
+    캐시 키(함수 소스·인자 이름)는 원래 함수 기준으로 그대로 계산된다.
+    """
+    def wrap(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def body(*args, **kwargs):
+            run = _current()
+            if run is not None:
+                run["misses"].add(label)
+            return func(*args, **kwargs)
+
+        cached_func = cache_decorator(body)
+
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            run = _current()
+            if run is None:
+                return cached_func(*args, **kwargs)
+
+            # 중첩 호출(캐시 함수 안에서 다른 캐시 함수)도 각각 기록되도록 자기 이름만 확인
+            run["misses"].discard(label)
+            start = time.perf_counter()
+            try:
+                return cached_func(*args, **kwargs)
+            finally:
+                run["last"] = time.perf_counter()
+                run["cache"].append({
+                    "name": label,
+                    "ms": round((run["last"] - start) * 1000, 2),
+                    "hit": label not in run["misses"],
+                })
+
+        call.clear = cached_func.clear
+        return call
+
+    return wrap
@@ -0,0 +1,237 @@
+"""
+백그라운드 데이터 갱신
+
+요청 처리 경로 밖에서 CSV 변경을 감지해 다시 수집하고, 검증과 캐시 준비가 끝난 뒤에야
+새 버전을 모든 세션에 공개(publish)한다. 사용자는 CSV 파싱 비용을 내지 않고,
+반쯤 쓰인 파일도 보지 않는다.
+
+감시 대상
+- 데이터 폴더(DATA_DIR)의 CSV: 제자리에서 수정된 경우
+- 투입 폴더(COVID_DROP_DIR, 선택): 새 파일을 여기에 놓으면 데이터 폴더로 옮겨 교체 (권장)
+
+파일 하나를 처리하는 순서
+1) 크기·수정 시각이 한 주기 동안 그대로일 때만 처리 (복사 중인 파일은 건너뜀)
+2) 투입 폴더의 파일은 데이터 폴더 안의 .staging/ 으로 복사 (같은 파일 시스템이라 교체가 원자적)
+3) read_* 함수로 파싱하고 검증 (빈 표, 행 수가 이전 스냅샷의 절반 미만이면 거부)
+   일별 파일은 전체를 파싱하지 않고 증분 저장소(timeseries.py)에 새로 붙은 행만 반영한 뒤 저장소의 표로 검증
+4) 스냅샷 저장 → CSV 교체(os.replace) → 캐시 준비(스냅샷을 메모리 매핑해서 읽음)
+5) data_loader.publish()로 새 수정 시각을 공개. 이때부터 요청이 새 캐시 키를 사용
+
+거부된 투입 파일은 <이름>.rejected 로 바꿔 두고 이전 버전을 계속 사용한다.
+
+실행 방법
+- 대시보드 프로세스 안의 스레드: COVID_REFRESH_SECONDS=30 (주기, 초). 캐시 준비까지 한다.
+- 별도 프로세스: python refresher.py --interval 30 [--once]
+  대시보드와 메모리를 공유하지 않으므로 4)의 스냅샷까지만 만들고, 대시보드는 다음 요청에서
+  CSV 대신 최신 스냅샷을 메모리 매핑해서 읽는다.
+"""
+import argparse
+import logging
+import os
+import shutil
+import threading
+import time
+
+import streamlit as st
+
+import ages
+import data_loader
+import geo
+import regions
+import snapshot
+import timeseries
+
+DROP_DIR = os.environ.get("COVID_DROP_DIR")
+STAGING_DIR = ".staging"
+MIN_ROW_RATIO = 0.5
+
+logger = logging.getLogger("covid_dashboard.refresh")
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def validate(name, df, snapshot_dir=snapshot.SNAPSHOT_DIR):
+    """새 데이터가 공개해도 될 상태인지 확인한다. 문제가 있으면 ValueError."""
+    if df.empty:
+        raise ValueError(f"[{name}] 정리 후 남은 행이 없습니다.")
+    manifest = snapshot.read_manifest(name, snapshot_dir)
+    if manifest is not None and len(df) < manifest["rows"] * MIN_ROW_RATIO:
+        raise ValueError(f"[{name}] 행 수가 {manifest['rows']:,} → {len(df):,}로 크게 줄었습니다. 잘린 파일일 수 있습니다.")
+
+
+# 데이터셋마다 공개 전에 미리 채워 둘 캐시 (화면에서 쓰는 로더와 같은 키)
+def _warm_worldwide(path, mtime):
+    data_loader.load_dataset("worldwide", path, mtime)
+    data_loader._cached_country_index(path, mtime)
+
+
+def _warm_cumulative(path, mtime):
+    coords = geo.load_region_coords()
+    regions._cached_hierarchy(path, mtime, coords.version, coords)
+
+
+def _warm_daily(path, mtime):
+    # 화면은 일별 프레임이 아니라 저장소로 만든 큐브만 읽음
+    timeseries._cached_cube(path, mtime)
+
+
+def _warm_age(path, mtime):
+    ages._cached_age_table(path, mtime)
+
+
+WARMERS = {
+    "worldwide": _warm_worldwide,
+    "cumulative": _warm_cumulative,
+    "daily": _warm_daily,
+    "age": _warm_age,
+}
+
+
+class Refresher:
+    def __init__(self, data_dir=None, drop_dir=DROP_DIR, warm=True, snapshot_dir=snapshot.SNAPSHOT_DIR):
+        self.data_dir = data_dir or data_loader.DATA_DIR
+        self.drop_dir = drop_dir
+        self.warm = warm
+        self.snapshot_dir = snapshot_dir
+        # 경로 → 직전 주기에 본 (크기, 수정 시각). 두 번 연속 같아야 처리
+        self._pending = {}
+        # 경로 → 마지막으로 처리(공개 또는 거부)한 (크기, 수정 시각)
+        self._done = {}
+
+        # 시작 시점에 스냅샷이 최신인 파일은 처리된 것으로 보고, 오래된 파일은 첫 주기에 다시 수집
+        for name, (file_name, _) in data_loader.DATASETS.items():
+            path = os.path.join(self.data_dir, file_name)
+            manifest = snapshot.read_manifest(name, snapshot_dir)
+            if snapshot.is_fresh(manifest, path, data_loader.SCHEMA_VERSION, data_loader.dataset_deps(name)):
+                self._done[path] = _stamp(path)
+            if self.warm and os.path.exists(path):
+                data_loader.publish(path, os.path.getmtime(path))
+
+    def _is_stable(self, path):
+        stamp = _stamp(path)
+        if stamp is None or stamp == self._done.get(path):
+            self._pending.pop(path, None)
+            return False
+        stable = self._pending.get(path) == stamp
+        self._pending[path] = stamp
+        return stable
+
+    def poll_once(self):
+        """한 주기 처리. (데이터셋 이름, 결과) 목록을 돌려준다. 결과는 "published" 또는 오류 메시지."""
+        results = []
+        for name, (file_name, _) in data_loader.DATASETS.items():
+            target = os.path.join(self.data_dir, file_name)
+            dropped = self.drop_dir and os.path.join(self.drop_dir, file_name)
+            source = dropped if dropped and os.path.exists(dropped) else target
+            if not self._is_stable(source):
+                continue
+            results.append((name, self._refresh(name, source, target)))
+        return results
+
+    def _read(self, name, path):
+        if name != "daily":
+            return data_loader.DATASETS[name][1](path)
+        # 일별 파일은 새로 붙은 행만 파싱 (대시보드와 같은 저장소를 쓰므로 캐시 준비 때는 다시 읽지 않음)
+        try:
+            timeseries.update_daily_store(path)
+            trend = timeseries.read_daily_store()
+        except OSError:
+            return data_loader.read_daily(path)
+        if trend is None:
+            raise ValueError(f"[{name}] 정리 후 남은 행이 없습니다.")
+        return trend.daily
+
+    def _refresh(self, name, source, target):
+        stamp = _stamp(source)
+        self._pending.pop(source, None)
+        self._done[source] = stamp
+        try:
+            staged = self._stage(source, target) if source != target else target
+            df = self._read(name, staged)
+            validate(name, df, self.snapshot_dir)
+            if _stamp(source) != stamp:
+                # 파싱하는 동안 또 바뀌었으면 다음 주기에 다시 처리
+                self._done.pop(source, None)
+                return "changed while reading"
+        except Exception as e:  # noqa: BLE001 - 어떤 오류든 이전 버전을 유지
+            logger.warning("갱신 거부 %s: %s", os.path.basename(source), e)
+            if source != target:
+                os.replace(source, source + ".rejected")
+                self._done.pop(source, None)
+            return str(e)
+
+        # 스냅샷은 교체 전 파일 기준으로 찍어도 os.replace 후 크기·수정 시각이 같아 그대로 최신
+        snapshot.write_snapshot(
+            name, df, staged, data_loader.SCHEMA_VERSION, self.snapshot_dir, deps=data_loader.dataset_deps(name)
+        )
+        if staged != target:
+            os.replace(staged, target)
+            os.remove(source)
+            self._done.pop(source, None)
+        self._done[target] = _stamp(target)
+
+        mtime = os.path.getmtime(target)
+        if self.warm:
+            WARMERS[name](target, mtime)
+            data_loader.publish(target, mtime)
+        logger.info("갱신 완료 %s: %s행", os.path.basename(target), f"{len(df):,}")
+        return "published"
+
+    def _stage(self, source, target):
+        staging = os.path.join(os.path.dirname(target), STAGING_DIR)
+        os.makedirs(staging, exist_ok=True)
+        staged = os.path.join(staging, os.path.basename(target))
+        shutil.copy2(source, staged)
+        return staged
+
+    def run(self, interval, stop=None):
+        stop = stop or threading.Event()
+        while not stop.wait(interval):
+            try:
+                self.poll_once()
+            except Exception:  # noqa: BLE001 - 감시 스레드는 죽지 않게
+                logger.exception("갱신 주기 실패")
+
+
+@st.cache_resource(show_spinner=False)
+def _background(interval, drop_dir):
+    refresher = Refresher(drop_dir=drop_dir)
+    thread = threading.Thread(target=refresher.run, args=(interval,), name="covid-refresher", daemon=True)
+    thread.start()
+    return refresher
+
+
+def start_background():
+    """COVID_REFRESH_SECONDS가 있으면 프로세스마다 한 번만 감시 스레드를 시작한다."""
+    interval = float(os.environ.get("COVID_REFRESH_SECONDS", "0") or 0)
+    if interval > 0:
+        return _background(interval, DROP_DIR)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interval", type=float, default=30, help="감시 주기 (초)")
+    parser.add_argument("--drop-dir", default=DROP_DIR, help="새 CSV를 놓는 투입 폴더")
+    parser.add_argument("--once", action="store_true", help="변경을 한 번 처리하고 종료 (1초 간격으로 두 번 확인해 안정된 파일만)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    refresher = Refresher(drop_dir=args.drop_dir, warm=False)
+    if args.once:
+        refresher.poll_once()
+        time.sleep(1)
+        for name, result in refresher.poll_once():
+            print(f"{name:<12} {result}")
+        return
+    refresher.run(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+누적.csv 지역 계층 (전국 → 시도 → 시군구)
+
+누적.csv는 한 파일에 세 단계가 섞여 있다.
+- 첫 행 "계"                : 전국 합계
+- 시도명이 바뀌는 첫 행      : 그 시도의 합계
+- 같은 시도명의 나머지 행    : 시군구 (원본에 시군구 이름이 없어 시도 안 순번으로 구분)
+
+read_cumulative()가 각 행에 단계(level)와 시군구 번호를 붙이고, RegionHierarchy가
+단계별 표와 하위 지역 합계(rollup)를 한 번만 만들어 둔다. 차트는 필요한 단계의 표를
+그대로 읽으므로 rerun마다 groupby를 다시 하지 않는다. 시도 합계 행이 시군구 합계와 다르면
+mismatches에 남겨 시군구 보기에서 알려 준다.
+시도 중심 좌표(geo.py의 좌표 표)도 여기서 한 번만 인덱스 join 해 둔다.
+"""
+import streamlit as st
+
+import data_loader
+import geo
+import profiling
+
+QUARANTINE = "검역"
+
+
+class RegionHierarchy:
+    def __init__(self, flat, coords=None):
+        counts = data_loader.CUMULATIVE_NUM_COLS
+        level = flat["level"]
+
+        self.sido = flat.loc[level == "sido", ["구분", *counts]].set_index("구분")
+        self.sigungu = (
+            flat.loc[level == "sigungu", ["구분", "시군구번호", *counts]].set_index(["구분", "시군구번호"]).sort_index()
+        )
+        nation = flat.loc[level == "nation", counts]
+        self.nation = nation.iloc[0] if len(nation) else self.sido[counts].sum()
+
+        # 하위 지역 합계: 원본의 합계 행과 맞지 않는 시도는 mismatches에 남긴다
+        self.sido_rollup = self.sigungu.groupby(level="구분")[counts].sum()
+        self.sido["시군구 수"] = self.sigungu.groupby(level="구분").size().reindex(self.sido.index, fill_value=0)
+        has_children = self.sido_rollup.index
+        diff = self.sido.loc[has_children, counts].sub(self.sido_rollup)
+        self.mismatches = diff[diff.ne(0).any(axis=1)]
+
+        # 좌표 join (좌표가 없는 지역은 지도에서 제외)
+        coords = coords or geo.load_region_coords()
+        self.sido_geo = self.sido_table().join(coords.sido, how="inner")
+
+    def children(self, sido):
+        """시도 하나의 시군구 행 (정렬된 MultiIndex에서 바로 잘라냄)."""
+        if sido not in self.sido_rollup.index:
+            return self.sigungu.iloc[0:0].droplevel("구분")
+        return self.sigungu.loc[sido]
+
+    def sido_table(self, include_quarantine=False):
+        if include_quarantine:
+            return self.sido
+        return self.sido.drop(index=QUARANTINE, errors="ignore")
+
+
+@profiling.cached(st.cache_resource(show_spinner=False, max_entries=2))
+def _cached_hierarchy(path, mtime, coords_version, _coords):
+    return RegionHierarchy(data_loader.load_dataset("cumulative", path, mtime), _coords)
+
+
+def load_region_hierarchy():
+    path = data_loader.data_path(data_loader.CUMULATIVE_CSV)
+    coords = geo.load_region_coords()
+    return _cached_hierarchy(path, data_loader.source_mtime(path), coords.version, coords)
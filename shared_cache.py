@@ -0,0 +1,160 @@
+"""
+여러 Streamlit 프로세스(레플리카)가 함께 쓰는 디스크 캐시 (선택 사항)
+
+st.cache_* 는 프로세스마다 따로 메모리에 캐시하므로, 한 호스트에서 레플리카 N개를 띄우면
+CSV 파싱과 차트 생성도 N번, 메모리도 N배가 된다. COVID_SHARED_CACHE_DIR를 주면
+- 정리된 프레임: 캐시 미스로 CSV를 파싱한 프로세스가 스냅샷(snapshot.py)을 써 두고
+  모든 프로세스가 그 스냅샷을 메모리 매핑해서 읽는다 (숫자 컬럼은 OS 페이지 캐시 하나를 공유)
+- 차트: figure JSON을 <폴더>/figures/<키>.json 에 저장하고 다른 프로세스는 파일에서 불러온다
+  (불러오기가 새로 만드는 것보다 수 배 빠름)
+
+프로세스 안의 st.cache_* 는 그대로 앞단에 두고, 이 캐시는 프로세스 캐시가 비었을 때만 확인한다.
+
+동시에 쓰는 경우
+- 스냅샷·차트 파일: 프로세스마다 다른 임시 이름에 쓰고 교체하므로 같은 항목을 여럿이 써도 안전
+- 일별 증분 저장소(COVID_SNAPSHOT_DIR/daily_store): 파일을 제자리에서 늘려 가므로 임시 이름으로는
+  부족하다. 갱신·읽기 모두 저장소의 .lock 에 파일 잠금(fcntl.flock, Windows는 msvcrt.locking)을
+  잡고 한 번에 하나씩 한다 (같은 호스트의 로컬 파일 시스템에서만 믿을 수 있으므로 NFS 등에 두지 말 것)
+키는 Streamlit 캐시와 같은 재료로 만든다: 함수 이름과 소스, 이름이 _로 시작하지 않는 인자
+(DataFrame은 내용 해시).
+
+정리
+- COVID_SHARED_CACHE_HOURS (기본 24): 이보다 오래 안 쓴 항목은 미스로 보고 삭제
+- COVID_SHARED_CACHE_MB (기본 512): 전체 크기가 넘으면 가장 오래 안 쓴 항목부터 삭제
+"""
+import functools
+import hashlib
+import inspect
+import os
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+CACHE_DIR = os.environ.get("COVID_SHARED_CACHE_DIR")
+ENABLED = bool(CACHE_DIR)
+MAX_BYTES = float(os.environ.get("COVID_SHARED_CACHE_MB", "512")) * 1024 * 1024
+MAX_AGE = float(os.environ.get("COVID_SHARED_CACHE_HOURS", "24")) * 3600
+
+
+# ===========================================================================================================================
+# 키
+# ===========================================================================================================================
+
+def _update(h, value):
+    if isinstance(value, pd.DataFrame):
+        h.update(repr((list(value.columns), value.dtypes.astype(str).tolist())).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, (pd.Series, pd.Index)):
+        h.update(repr((value.name, str(value.dtype))).encode())
+        h.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(repr((value.dtype.str, value.shape)).encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _update(h, item)
+    elif isinstance(value, dict):
+        _update(h, sorted(value.items()))
+    else:
+        h.update(repr(value).encode())
+
+
+def make_key(func, args, kwargs):
+    bound = inspect.signature(func).bind(*args, **kwargs)
+    bound.apply_defaults()
+    h = hashlib.sha1(f"{func.__module__}.{func.__qualname__}".encode())
+    h.update(inspect.getsource(func).encode())
+    for name, value in bound.arguments.items():
+        if not name.startswith("_"):
+            h.update(name.encode())
+            _update(h, value)
+    return h.hexdigest()
+
+
+# ===========================================================================================================================
+# 저장소
+# ===========================================================================================================================
+
+def _folder(kind):
+    return os.path.join(CACHE_DIR, kind)
+
+
+def read_entry(kind, key):
+    path = os.path.join(_folder(kind), key)
+    try:
+        if time.time() - os.path.getmtime(path) > MAX_AGE:
+            os.remove(path)
+            return None
+        with open(path, "rb") as f:
+            data = f.read()
+        # 읽을 때마다 수정 시각을 갱신해서 오래 안 쓴 순서로 정리
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return data
+
+
+def write_entry(kind, key, data):
+    folder = _folder(kind)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, key)
+    # 다른 프로세스가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓰고 교체
+    tmp = f"{path}.{os.getpid()}-{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    evict(kind)
+
+
+def evict(kind):
+    """오래된 항목을 지우고, 전체 크기가 MAX_BYTES를 넘으면 가장 오래 안 쓴 것부터 지운다."""
+    entries = []
+    now = time.time()
+    with os.scandir(_folder(kind)) as it:
+        for entry in it:
+            if entry.name.endswith(".tmp"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    for mtime, size, path in sorted(entries):
+        if now - mtime <= MAX_AGE and total <= MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+# ===========================================================================================================================
+# 차트 캐시
+# ===========================================================================================================================
+
+def figures(func):
+    """
+    차트 함수를 감싸 figure JSON을 공유 캐시에 저장·재사용한다. 꺼져 있으면 func 그대로.
+    charts.figure_cache가 st.cache_resource 안쪽에 이 함수를 끼운다.
+    """
+    if not ENABLED:
+        return func
+
+    @functools.wraps(func)
+    def call(*args, **kwargs):
+        key = make_key(func, args, kwargs) + ".json"
+        data = read_entry("figures", key)
+        if data is not None:
+            return pio.from_json(data.decode("utf-8"))
+        fig = func(*args, **kwargs)
+        write_entry("figures", key, fig.to_json().encode("utf-8"))
+        return fig
+
+    return call
@@ -0,0 +1,152 @@
+"""
+정리된 DataFrame의 바이너리 스냅샷
+
+CSV를 매번 텍스트로 파싱하는 대신, 정리가 끝난 DataFrame을 컬럼별 .npy 파일과
+manifest.json으로 저장해 두고 np.load(mmap_mode="r")로 메모리 매핑해서 읽는다.
+여러 워커 프로세스가 같은 스냅샷을 읽으면 OS 페이지 캐시를 공유한다.
+
+    .snapshot/<이름>/manifest.json
+    .snapshot/<이름>/c0.npy, c1.npy, ...
+
+manifest에는 원본 CSV의 크기·수정 시각, 정리 결과에 영향을 주는 다른 파일(deps, 예: 나라 별칭 표)의
+크기·수정 시각, 정리 코드의 스키마 버전이 기록되며, 하나라도 달라지면 스냅샷은 오래된(stale) 것으로 보고
+read_snapshot()이 None을 돌려준다.
+"""
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_DIR = os.environ.get(
+    "COVID_SNAPSHOT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".snapshot")
+)
+FORMAT_VERSION = 3
+
+
+def _source_stamp(source_path):
+    stat = os.stat(source_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _dep_stamps(deps):
+    return {os.path.basename(path): _source_stamp(path) for path in deps}
+
+
+def _is_nullable_int(dtype):
+    return pd.api.types.is_extension_array_dtype(dtype) and pd.api.types.is_integer_dtype(dtype)
+
+
+def _column_array(series):
+    # 문자열(object) 컬럼은 mmap이 가능한 고정 길이 유니코드 배열로 저장
+    values = series.to_numpy()
+    if values.dtype == object:
+        values = values.astype(str)
+    return values
+
+
+def write_snapshot(name, df, source_path, schema=0, snapshot_dir=SNAPSHOT_DIR, deps=()):
+    target = os.path.join(snapshot_dir, name)
+    # 여러 프로세스가 같은 스냅샷을 동시에 써도 겹치지 않도록 임시 폴더 이름은 프로세스마다 다르게
+    tmp = f"{target}.{os.getpid()}-{uuid.uuid4().hex[:8]}.tmp"
+    os.makedirs(tmp)
+
+    columns = []
+    frame = df.reset_index() if df.index.name is not None else df
+    for i, col in enumerate(frame.columns):
+        series = frame[col]
+        entry = {"name": col, "file": f"c{i}.npy"}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # 범주형은 코드 배열(mmap)과 범주 목록을 따로 저장
+            entry["categories"] = f"c{i}.cats.npy"
+            np.save(os.path.join(tmp, entry["categories"]), _column_array(series.cat.categories), allow_pickle=False)
+            values = series.cat.codes.to_numpy()
+        elif _is_nullable_int(series.dtype):
+            # nullable 정수(Int32/Int64)는 값 배열과 결측 마스크를 따로 저장
+            entry["mask"] = f"c{i}.mask.npy"
+            np.save(os.path.join(tmp, entry["mask"]), series.isna().to_numpy(), allow_pickle=False)
+            values = series.to_numpy(dtype=series.dtype.numpy_dtype, na_value=0)
+        else:
+            values = _column_array(series)
+        np.save(os.path.join(tmp, entry["file"]), values, allow_pickle=False)
+        entry["dtype"] = str(series.dtype)
+        if isinstance(series.dtype, pd.StringDtype):
+            entry["dtype"] = f"string[{series.dtype.storage}]"
+        columns.append(entry)
+
+    manifest = {
+        "format": FORMAT_VERSION,
+        "schema": schema,
+        "source": os.path.basename(source_path),
+        "source_stamp": _source_stamp(source_path),
+        "deps": _dep_stamps(deps),
+        "rows": len(frame),
+        "index": df.index.name,
+        "columns": columns,
+    }
+    with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    # 읽는 쪽이 반쯤 쓰인 스냅샷을 보지 않도록 디렉터리 단위로 교체
+    shutil.rmtree(target, ignore_errors=True)
+    try:
+        os.replace(tmp, target)
+    except OSError:
+        # 그 사이 다른 프로세스가 같은 원본으로 먼저 교체했으면 그 스냅샷을 그대로 사용
+        shutil.rmtree(tmp, ignore_errors=True)
+    return target
+
+
+def read_manifest(name, snapshot_dir=SNAPSHOT_DIR):
+    try:
+        with open(os.path.join(snapshot_dir, name, "manifest.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        # 없거나 읽을 수 없는 스냅샷 폴더 (쓸 수 없는 경로 등)는 스냅샷이 없는 것으로 봄
+        return None
+
+
+def is_fresh(manifest, source_path, schema=0, deps=()):
+    if manifest is None or manifest.get("format") != FORMAT_VERSION or manifest.get("schema") != schema:
+        return False
+    try:
+        return manifest["source_stamp"] == _source_stamp(source_path) and manifest.get("deps", {}) == _dep_stamps(deps)
+    except FileNotFoundError:
+        return False
+
+
+def read_snapshot(name, source_path, schema=0, snapshot_dir=SNAPSHOT_DIR, deps=()):
+    manifest = read_manifest(name, snapshot_dir)
+    if not is_fresh(manifest, source_path, schema, deps):
+        return None
+
+    try:
+        return _load_columns(os.path.join(snapshot_dir, name), manifest)
+    except FileNotFoundError:
+        # 읽는 도중 다른 프로세스가 스냅샷을 교체함 (호출한 쪽이 CSV를 읽음)
+        return None
+
+
+def _load_columns(folder, manifest):
+    data = {}
+    for col in manifest["columns"]:
+        values = np.load(os.path.join(folder, col["file"]), mmap_mode="r", allow_pickle=False)
+        if "categories" in col:
+            categories = np.load(os.path.join(folder, col["categories"]), allow_pickle=False).astype(object)
+            values = pd.Categorical.from_codes(values, categories=categories)
+        elif "mask" in col:
+            mask = np.load(os.path.join(folder, col["mask"]), allow_pickle=False)
+            values = pd.arrays.IntegerArray(values, mask)
+        elif col["dtype"].startswith("string"):
+            values = pd.array(values, dtype=col["dtype"])
+        elif values.dtype.kind == "U":
+            values = values.astype(object)
+        data[col["name"]] = values
+
+    # copy=False: 숫자 컬럼은 매핑된 배열을 그대로 사용
+    df = pd.DataFrame(data, copy=False)
+    if manifest["index"] is not None:
+        df = df.set_index(manifest["index"])
+    return df
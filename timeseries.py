@@ -0,0 +1,440 @@
+"""
+일별 국내 & 해외.csv 증분 수집과 월별 집계
+
+일별 파일은 뒤에 행이 붙기만 하는(append-only) 시계열이므로, 매번 전체를 다시 읽지 않고
+마지막으로 읽은 바이트 위치(offset) 이후에 붙은 행만 파싱한다. 상태는 프로세스를
+재시작해도 이어지도록 디스크에 저장한다.
+
+    .snapshot/daily_store/state.json  읽은 위치, 마지막 날짜, 인코딩, 헤더 등
+    .snapshot/daily_store/dates.bin   날짜 (datetime64[ns] → int64), 행마다 추가
+    .snapshot/daily_store/c0.bin ...  컬럼 값 (int64), 행마다 추가
+    .snapshot/daily_store/monthly-<행 수>.npy  월별 합계 (월 × 컬럼)
+    .snapshot/daily_store/smooth-<행 수>.npy   월별 합계의 이동평균
+
+새 행이 붙으면 해당 월의 합계만 더하고, 이동평균은 바뀐 월부터 끝까지만 다시 계산한다.
+줄바꿈 없이 끝난 마지막 줄은 헤더와 필드 수가 같은 완전한 행일 때만 읽고(open_line), 다음 갱신에서
+그 줄 바로 뒤가 줄바꿈인지 확인한다. 그 줄이 이어서 쓰인 것이면 처음부터 다시 만든다.
+파일 앞부분이 바뀌었거나(교체·수정), 새 행의 날짜가 마지막 날짜보다 앞서면 처음부터 다시 만든다.
+state.json을 마지막에 원자적으로 교체하므로, 중간에 실패해도 이전 상태가 그대로 남는다.
+여러 프로세스(레플리카, 백그라운드 갱신)가 같은 저장소를 쓰므로, 갱신과 읽기는 모두
+.snapshot/daily_store/.lock 에 배타적 잠금(fcntl.flock, Windows는 msvcrt.locking)을 잡고 한 번에 하나씩 한다.
+
+AggregationCube는 일별 데이터를 일/주/월/분기/연 단위로 합산하고 단위별 이동평균을
+데이터 버전마다 한 번만 미리 계산해 둔다. 월 단위 합계와 3개월 이동평균은 저장소가 증분으로
+유지한 값을 그대로 쓴다. 사이드바에서 단위·창 크기·기간을 바꾸면
+다시 계산하지 않고 이분 탐색으로 잘라서 돌려주며, 점이 많으면 downsample.py로 줄인다.
+"""
+import contextlib
+import csv
+import functools
+import hashlib
+import io
+import json
+import logging
+import os
+import uuid
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import data_loader
+import profiling
+import snapshot
+from downsample import downsample_frame
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+STORE_DIR = os.path.join(snapshot.SNAPSHOT_DIR, "daily_store")
+STATE_VERSION = 1
+DEFAULT_WINDOW = 3
+_TAIL_BYTES = 256
+
+DailyTrend = namedtuple("DailyTrend", ["daily", "monthly", "smooth"])
+
+logger = logging.getLogger("covid_dashboard.timeseries")
+
+
+# ===========================================================================================================================
+# 상태 파일
+# ===========================================================================================================================
+
+def _lock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        return
+    # 파일 첫 바이트를 잠금. LK_LOCK은 1초 간격으로 10번 시도한 뒤 OSError이므로 풀릴 때까지 반복
+    while True:
+        try:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue
+
+
+def _unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextlib.contextmanager
+def _locked(store_dir):
+    # 프로세스 사이 배타적 잠금. 잠금 파일을 닫으면 (프로세스가 죽어도) 풀림
+    os.makedirs(store_dir, exist_ok=True)
+    with open(os.path.join(store_dir, ".lock"), "a+") as f:
+        _lock_file(f)
+        try:
+            yield
+        finally:
+            _unlock_file(f)
+
+
+def _read_state(store_dir):
+    try:
+        with open(os.path.join(store_dir, "state.json"), encoding="utf-8") as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return state if state.get("version") == STATE_VERSION else None
+
+
+def _write_state(store_dir, state):
+    path = os.path.join(store_dir, "state.json")
+    tmp = f"{path}.{os.getpid()}-{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def _digest(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def _is_appended(state, source_path, head, tail, size):
+    # 이전에 읽은 부분이 그대로이고 뒤에만 붙었는지 확인 (헤더와 읽은 위치 직전 바이트 비교)
+    return (
+        state is not None
+        and state["schema"] == data_loader.SCHEMA_VERSION
+        and state["source"] == os.path.basename(source_path)
+        and size >= state["offset"]
+        and _digest(head) == state["head_digest"]
+        and _digest(tail) == state["tail_digest"]
+    )
+
+
+# ===========================================================================================================================
+# 파싱
+# ===========================================================================================================================
+
+def _parse_rows(header, body, encoding):
+    # 헤더 + 새로 붙은 행만 CSV로 파싱해서 대시보드와 같은 방식으로 정리
+    df = pd.read_csv(io.BytesIO(header + body), encoding=encoding, **data_loader.DAILY_READ_OPTIONS)
+    df = data_loader.clean_daily(df)
+    dates = df.index.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    # 잘못된 값(NaN)은 0으로 (대시보드의 합계에서 결측을 빼고 더하는 것과 같은 결과)
+    values = df[data_loader.DAILY_NUM_COLS].to_numpy(dtype=np.int64, na_value=0)
+    return dates, values
+
+
+def _is_complete_row(header, line, encoding):
+    # 줄바꿈 없이 끝난 마지막 줄이 헤더와 같은 수의 필드를 모두 가진 행인지 (쓰는 중인 줄은 대개 필드가 모자람)
+    try:
+        names = next(csv.reader([header.decode(encoding)]))
+        fields = next(csv.reader([line.decode(encoding)]))
+    except (UnicodeDecodeError, StopIteration, csv.Error):
+        return False
+    return len(fields) == len(names) and all(field.strip() for field in fields)
+
+
+def _months(dates_ns):
+    # 1970-01부터 센 월 번호
+    return dates_ns.astype("datetime64[ns]").astype("datetime64[M]").astype(np.int64)
+
+
+def rolling_mean_tail(sums, smooth, start, window):
+    """sums[k]의 window개월 이동평균(min_periods=1)을 k >= start 구간만 다시 계산."""
+    lo = max(start - window + 1, 0)
+    csum = np.cumsum(np.vstack([np.zeros((1, sums.shape[1])), sums[lo:]]), axis=0)
+    k = np.arange(start, len(sums))
+    begin = np.maximum(k - window + 1, 0)
+    counts = (k - begin + 1)[:, None]
+    smooth[start:] = (csum[k - lo + 1] - csum[begin - lo]) / counts
+    return smooth
+
+
+# ===========================================================================================================================
+# 증분 수집
+# ===========================================================================================================================
+
+def _data_files(columns):
+    return ["dates.bin"] + [f"c{i}.bin" for i in range(columns)]
+
+
+def _append_rows(store_dir, state, dates, values):
+    # 이전 실행이 중간에 멈춰 남은 꼬리 바이트는 잘라내고 이어 붙임
+    rows = state["rows"]
+    arrays = [dates] + [values[:, i] for i in range(values.shape[1])]
+    for file_name, array in zip(_data_files(values.shape[1]), arrays):
+        with open(os.path.join(store_dir, file_name), "ab") as f:
+            f.truncate(rows * 8)
+            f.write(np.ascontiguousarray(array, dtype=np.int64).tobytes())
+
+
+def _aggregate_files(rows):
+    # 행 수가 붙은 파일 이름을 쓰므로, state.json이 가리키는 집계 파일은 항상 그 상태와 일치
+    return f"monthly-{rows}.npy", f"smooth-{rows}.npy"
+
+
+def _update_monthly(store_dir, state, dates, values, window):
+    if state["rows"] == 0:
+        sums = np.zeros((0, values.shape[1]), dtype=np.int64)
+        smooth = np.zeros((0, values.shape[1]))
+        state["first_month"] = int(_months(dates[:1])[0])
+    else:
+        monthly_file, smooth_file = _aggregate_files(state["rows"])
+        sums = np.load(os.path.join(store_dir, monthly_file))
+        smooth = np.load(os.path.join(store_dir, smooth_file))
+
+    months = _months(dates) - state["first_month"]
+    grow = months.max() + 1 - len(sums)
+    if grow > 0:
+        # 데이터가 없는 달도 0으로 채움 (resample("M").sum()과 같은 결과)
+        sums = np.vstack([sums, np.zeros((grow, sums.shape[1]), dtype=np.int64)])
+        smooth = np.vstack([smooth, np.zeros((grow, smooth.shape[1]))])
+    np.add.at(sums, months, values)
+
+    rolling_mean_tail(sums, smooth, int(months.min()), window)
+    monthly_file, smooth_file = _aggregate_files(state["rows"] + len(dates))
+    np.save(os.path.join(store_dir, monthly_file), sums)
+    np.save(os.path.join(store_dir, smooth_file), smooth)
+
+
+def _remove_old_aggregates(store_dir, rows):
+    keep = set(_aggregate_files(rows))
+    for file_name in os.listdir(store_dir):
+        if file_name.startswith(("monthly-", "smooth-")) and file_name not in keep:
+            os.remove(os.path.join(store_dir, file_name))
+
+
+def update_daily_store(source_path, store_dir=STORE_DIR, window=DEFAULT_WINDOW):
+    """
+    source_path에서 새로 붙은 행만 읽어 저장소에 반영하고, 새로 반영한 행 수를 돌려준다.
+    처음 실행이거나 파일이 append가 아닌 방식으로 바뀌었으면 전체를 다시 수집한다.
+    """
+    with _locked(store_dir):
+        return _update_daily_store(source_path, store_dir, window)
+
+
+def _update_daily_store(source_path, store_dir, window):
+    state = _read_state(store_dir)
+
+    with open(source_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        header = f.readline()
+        if state is not None:
+            # 헤더, 읽은 위치 직전 바이트, 그 뒤에 붙은 부분만 읽음
+            start = max(state["offset"] - _TAIL_BYTES, len(header))
+            f.seek(start)
+            chunk = f.read()
+            tail = chunk[:max(state["offset"] - start, 0)]
+            # 지난번에 줄바꿈 없는 마지막 줄까지 읽었다면, 그 뒤에 붙은 것은 줄바꿈으로 시작해야 함
+            # (아니면 그 줄이 이어서 쓰인 것이므로 이미 반영한 값이 틀림)
+            extended = state.get("open_line") and chunk[len(tail):len(tail) + 1] not in (b"", b"\r", b"\n")
+            if _is_appended(state, source_path, header, tail, size) and state["window"] == window and not extended:
+                base, body_start = start, state["offset"] - start
+            else:
+                state = None
+        if state is None:
+            f.seek(len(header))
+            chunk = f.read()
+            base, body_start = len(header), 0
+
+    if state is None:
+        # 처음부터 다시 만드는 동안 중단되면 다음 실행도 처음부터 하도록 이전 상태 삭제.
+        # 데이터 파일은 잘라내지 않고 지운 뒤 새로 만듦 (이미 메모리 매핑한 쪽은 이전 파일을 계속 읽음)
+        for file_name in ["state.json"] + _data_files(len(data_loader.DAILY_NUM_COLS)):
+            if os.path.exists(os.path.join(store_dir, file_name)):
+                os.remove(os.path.join(store_dir, file_name))
+        state = {
+            "version": STATE_VERSION,
+            "schema": data_loader.SCHEMA_VERSION,
+            "source": os.path.basename(source_path),
+            "encoding": data_loader.sniff_encoding((header + chunk)[:data_loader.SNIFF_BYTES]),
+            "head_digest": _digest(header),
+            "offset": len(header),
+            "rows": 0,
+            "last_date": None,
+            "first_month": None,
+            "window": window,
+            "columns": data_loader.DAILY_NUM_COLS,
+        }
+
+    # 마지막 줄바꿈까지만 읽음 (쓰는 중인 마지막 줄은 다음 번에). 단 줄바꿈 없이 끝난
+    # 완전한 행은 지금 읽음 (끝에 줄바꿈이 없는 파일의 마지막 날짜가 빠지지 않도록)
+    cut = chunk.rfind(b"\n") + 1
+    last = chunk[max(cut, body_start):]
+    if last.strip() and _is_complete_row(header, last, state["encoding"]):
+        cut = len(chunk)
+    body = chunk[body_start:cut] if cut > body_start else b""
+    if not body.strip():
+        return 0
+
+    dates, values = _parse_rows(header, body, state["encoding"])
+    if len(dates) and state["last_date"] is not None and dates.min() <= state["last_date"]:
+        # 과거 날짜가 끼어들었으면 append-only가 아니므로 처음부터 다시
+        os.remove(os.path.join(store_dir, "state.json"))
+        return _update_daily_store(source_path, store_dir, window)
+
+    if len(dates):
+        _append_rows(store_dir, state, dates, values)
+        _update_monthly(store_dir, state, dates, values, window)
+        state["rows"] += len(dates)
+        state["last_date"] = int(dates.max())
+
+    end = base + cut
+    state["offset"] = end
+    state["open_line"] = not chunk[:cut].endswith(b"\n")
+    state["tail_digest"] = _digest(chunk[max(cut - _TAIL_BYTES, 0):cut])
+    _write_state(store_dir, state)
+    _remove_old_aggregates(store_dir, state["rows"])
+    return len(dates)
+
+
+# ===========================================================================================================================
+# 저장소 읽기
+# ===========================================================================================================================
+
+def _month_end_index(first_month, count):
+    months = np.arange(first_month, first_month + count).astype("datetime64[M]")
+    return pd.DatetimeIndex(((months + 1).astype("datetime64[D]") - 1).astype("datetime64[ns]"), name="일자")
+
+
+def read_daily_store(store_dir=STORE_DIR):
+    with _locked(store_dir):
+        return _read_daily_store(store_dir)
+
+
+def _read_daily_store(store_dir):
+    state = _read_state(store_dir)
+    if state is None or state["rows"] == 0:
+        return None
+
+    rows = state["rows"]
+
+    def column(file_name):
+        return np.memmap(os.path.join(store_dir, file_name), dtype=np.int64, mode="r", shape=(rows,))
+
+    columns = state["columns"]
+    daily = pd.DataFrame(
+        {col: column(f"c{i}.bin") for i, col in enumerate(columns)},
+        index=pd.DatetimeIndex(column("dates.bin").view("datetime64[ns]"), name="일자"),
+        copy=False,
+    )
+    monthly_file, smooth_file = _aggregate_files(rows)
+    sums = np.load(os.path.join(store_dir, monthly_file))
+    smooth = np.load(os.path.join(store_dir, smooth_file))
+    index = _month_end_index(state["first_month"], len(sums))
+    monthly = pd.DataFrame(sums, index=index, columns=columns)
+    smooth = pd.DataFrame(smooth, index=index, columns=columns)
+    return DailyTrend(daily, monthly, smooth)
+
+
+@profiling.cached(st.cache_resource(show_spinner=False, max_entries=2))
+def _cached_daily_trend(path, mtime):
+    try:
+        update_daily_store(path)
+        trend = read_daily_store()
+    except OSError as e:
+        # 스냅샷 폴더에 쓸 수 없는 배포 등: 저장소 없이 동작
+        logger.warning("일별 저장소를 쓸 수 없어 CSV 전체를 읽습니다: %s", e)
+        trend = None
+    if trend is None:
+        # 저장소를 못 쓰거나 데이터 행이 없으면 전체를 읽어 메모리에서만 집계 (월별 합계는 큐브가 계산)
+        return DailyTrend(data_loader.read_dataset("daily", path), None, None)
+    return trend
+
+
+# ===========================================================================================================================
+# 다중 해상도 집계 큐브
+# ===========================================================================================================================
+
+# 단위 이름: (Period 주기, 이동평균 창 크기 목록, 창 단위, plotly 날짜 표시 형식)
+GRANULARITIES = {
+    "일": ("D", [1, 7, 14, 28], "일", "%Y년 %m월 %d일"),
+    "주": ("W", [1, 2, 4, 8], "주", "%Y년 %m월 %d일 주"),
+    "월": ("M", [1, 3, 6, 12], "개월", "%Y년 %m월"),
+    "분기": ("Q", [1, 2, 4], "분기", "%Y년 %q분기"),
+    "연": ("Y", [1, 2, 3], "년", "%Y년"),
+}
+
+
+class AggregationCube:
+    def __init__(self, daily, trend=None):
+        # trend: 저장소의 DailyTrend. 있으면 월 단위 합계와 DEFAULT_WINDOW개월 이동평균을 다시 계산하지 않음
+        self.empty = daily.empty
+        self.tables = {}
+        for name, (freq, windows, _, _) in GRANULARITIES.items():
+            if name == "월" and trend is not None and trend.monthly is not None:
+                sums = trend.monthly
+                self.tables[name, DEFAULT_WINDOW] = trend.smooth
+            else:
+                periods = daily.index.to_period(freq)
+                sums = daily.groupby(periods).sum()
+                if len(sums):
+                    # 데이터가 없는 기간도 0으로 채움 (resample().sum()과 같은 결과)
+                    sums = sums.reindex(pd.period_range(periods.min(), periods.max(), freq=freq), fill_value=0)
+                sums = sums.set_axis(sums.index.to_timestamp(how="end").normalize().rename("일자"))
+            for window in windows:
+                if (name, window) not in self.tables:
+                    self.tables[name, window] = sums.rolling(window=window, min_periods=1).mean() if window > 1 else sums
+
+        # 같은 설정으로 다시 요청하면 다운샘플링 결과를 재사용
+        self.downsampled = functools.lru_cache(maxsize=64)(self._downsampled)
+
+    def windows(self, granularity):
+        return GRANULARITIES[granularity][1]
+
+    def date_range(self):
+        index = self.tables["일", 1].index
+        return index[0].date(), index[-1].date()
+
+    def _bounds(self, table, start, end):
+        lo = 0 if start is None else table.index.searchsorted(pd.Timestamp(start), side="left")
+        # 기간 라벨은 기간의 마지막 날이므로 end가 속한 기간까지 포함
+        hi = len(table) if end is None else min(table.index.searchsorted(pd.Timestamp(end)) + 1, len(table))
+        return lo, hi
+
+    def slice(self, granularity, window, start=None, end=None):
+        """미리 계산된 표에서 [start, end] 구간만 잘라서 반환 (복사 없이 이분 탐색)."""
+        table = self.tables[granularity, window]
+        lo, hi = self._bounds(table, start, end)
+        return table.iloc[lo:hi]
+
+    def count(self, granularity, start=None, end=None):
+        """slice() 결과의 행 수 (자르지 않고 이분 탐색만)."""
+        lo, hi = self._bounds(self.tables[granularity, 1], start, end)
+        return max(hi - lo, 0)
+
+    def _downsampled(self, granularity, window, start, end, method, n_out):
+        """slice() 결과를 n_out개 점 정도로 줄인 프레임 (method: "lttb" / "minmax")."""
+        return downsample_frame(self.slice(granularity, window, start, end), n_out, method)
+
+
+@profiling.cached(st.cache_resource(show_spinner=False, max_entries=2))
+def _cached_cube(path, mtime):
+    trend = _cached_daily_trend(path, mtime)
+    return AggregationCube(trend.daily, trend)
+
+
+def load_aggregation_cube():
+    path = data_loader.data_path(data_loader.DAILY_CSV)
+    return _cached_cube(path, data_loader.source_mtime(path))